@@ -0,0 +1,438 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from contextlib import nullcontext
+from math import pi
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from raytracer import stats
+from raytracer.cache import RenderCache
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas, quantize
+from raytracer.light import Light
+from raytracer.matrix import Matrix
+from raytracer.precision import DTYPES, Precision
+from raytracer.ray import Ray
+from raytracer.render import render, render_antialiased
+from raytracer.sphere import Sphere
+from raytracer.transformation import (
+    Transform,
+    rotation_y,
+    scaling,
+    translation,
+    view_transform,
+)
+from raytracer.tuple import Color, Point, Vector
+from raytracer.world import World
+
+# a benchmark builds its workload and returns the callable to time together
+# with the number of units (ops, rays, pixels) one call processes
+Benchmark = Callable[[], Tuple[Callable[[], object], int, str]]
+Results = Dict[str, Dict[str, Any]]
+
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.2
+RENDER_SIZES = (32, 64, 128)
+
+
+def bench_world() -> World:
+    shape = Sphere()
+    shape.material.color = Color(1, 0.2, 1)
+    world = World()
+    world.objects.append(shape)
+    world.light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    return world
+
+
+def bench_camera(size: int) -> Camera:
+    camera = Camera(size, size, pi / 3)
+    camera.transform = view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    return camera
+
+
+def tuple_add():
+    a, b = Point(1, 2, 3), Vector(0.5, -1, 2)
+    return lambda: a + b, 1, "ops/s"
+
+
+def tuple_normalize():
+    v = Vector(1, 2, 3)
+    return v.normalize, 1, "ops/s"
+
+
+def color_mul():
+    a, b = Color(0.9, 0.6, 0.75), Color(0.7, 0.1, 0.25)
+    return lambda: a * b, 1, "ops/s"
+
+
+def matrix_mul():
+    a = translation(1, 2, 3) * rotation_y(0.5)
+    b = scaling(1, 2, 3)
+    return lambda: a * b, 1, "ops/s"
+
+
+def matrix_mul_tuple():
+    a = translation(1, 2, 3) * rotation_y(0.5)
+    p = Point(1, 2, 3)
+    return lambda: a * p, 1, "ops/s"
+
+
+def matrix_inverse():
+    a = Matrix([[-5, 2, 6, -8], [1, -5, 1, 8], [7, 7, -6, -7], [1, -3, 7, 4]])
+    return a.inverse, 1, "ops/s"
+
+
+def transform_chain():
+    def build():
+        return (
+            Matrix.identity()
+            .rotate_x(0.5)
+            .rotate_y(0.25)
+            .scale(2, 2, 2)
+            .translate(1, 2, 3)
+            .inverse()
+        )
+
+    return build, 1, "ops/s"
+
+
+def transform_builder():
+    def build():
+        return (
+            Transform()
+            .rotate_x(0.5)
+            .rotate_y(0.25)
+            .scale(2, 2, 2)
+            .translate(1, 2, 3)
+            .inverse()
+        )
+
+    return build, 1, "ops/s"
+
+
+def ray_transform():
+    m = translation(0, 0, 1) * scaling(2, 2, 2)
+    r = Ray(Point(0, 0.5, -5), Vector(0, 0, 1))
+    return lambda: Ray(r.origin, r.direction).transform(m), 1, "rays/s"
+
+
+def ray_transformed():
+    m = translation(0, 0, 1) * scaling(2, 2, 2)
+    r = Ray(Point(0, 0.5, -5), Vector(0, 0, 1))
+    return lambda: r.transformed(m), 1, "rays/s"
+
+
+def sphere_intersect():
+    s = Sphere()
+    s.transform = translation(0, 0, 1) * scaling(2, 2, 2)
+    r = Ray(Point(0, 0.5, -5), Vector(0, 0, 1))
+    return lambda: s.intersect(r), 1, "rays/s"
+
+
+def sphere_intersect_batch():
+    s = Sphere()
+    s.transform = translation(0, 0, 1) * scaling(2, 2, 2)
+    rng = np.random.default_rng(0)
+    origins = rng.uniform(-3, 3, (4096, 3)) + (0, 0, -10)
+    directions = np.tile((0.0, 0.0, 1.0), (4096, 1))
+    return lambda: s.intersect_batch(origins, directions), len(origins), "rays/s"
+
+
+def material_lighting():
+    m = bench_world().objects[0].material
+    light = Light(Point(0, 10, -10), Color(1, 1, 1))
+    position, eyev = Point(0, 0, 0), Vector(0, -(2**0.5) / 2, -(2**0.5) / 2)
+    normalv = Vector(0, 0, -1)
+    return lambda: m.lighting(light, position, eyev, normalv), 1, "ops/s"
+
+
+def material_lighting_batch():
+    m = bench_world().objects[0].material
+    light = Light(Point(0, 10, -10), Color(1, 1, 1))
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1, 1, (4096, 3))
+    eyevs = np.tile((0.0, 0.0, -1.0), (4096, 1))
+    normals = eyevs + rng.uniform(-0.2, 0.2, (4096, 3))
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    return lambda: m.lighting_batch(light, points, eyevs, normals), 4096, "ops/s"
+
+
+def canvas_to_ppm():
+    canvas = Canvas(128, 128)
+    canvas.pixels[:] = np.random.default_rng(0).random(canvas.pixels.shape)
+    return canvas.to_ppm, canvas.width * canvas.height, "pixels/s"
+
+
+def many_spheres() -> World:
+    world = bench_world()
+    rng = np.random.default_rng(0)
+    for position in rng.uniform(-4, 4, (1000, 3)):
+        s = Sphere()
+        s.transform = translation(*position) * scaling(0.1, 0.1, 0.1)
+        world.objects.append(s)
+    world.bvh  # build outside the timed call
+    return world
+
+
+def sphere_grid() -> World:
+    # a 7x7 grid of small spheres in front of the bench sphere, leaving most
+    # of the frame as background
+    world = bench_world()
+    for x in np.linspace(-3, 3, 7):
+        for y in np.linspace(-3, 3, 7):
+            s = Sphere()
+            s.transform = translation(x, y, -1) * scaling(0.2, 0.2, 0.2)
+            world.objects.append(s)
+    return world
+
+
+def world_intersect():
+    world = many_spheres()
+    r = Ray(Point(0.05, 0.05, -10), Vector(0, 0, 1))
+    return lambda: world.intersect(r), 1, "rays/s"
+
+
+def world_nearest_hit():
+    world = many_spheres()
+    r = Ray(Point(0.05, 0.05, -10), Vector(0, 0, 1))
+    return lambda: world.nearest_hit(r), 1, "rays/s"
+
+
+def world_is_shadowed():
+    # the shadow ray for a point on the far side of the field of spheres
+    world = many_spheres()
+    light = Light(Point(0.05, 0.05, -10), Color(1, 1, 1))
+    p = Point(0.05, 0.05, 10)
+    return lambda: world.is_shadowed(p, light), 1, "rays/s"
+
+
+def render_at(
+    size: int,
+    batch: bool = False,
+    collect: bool = False,
+    precision: Precision = None,
+    scene: Callable[[], World] = bench_world,
+) -> Benchmark:
+    # with collect=False this is the cost of the uninstrumented render,
+    # so render_* regressions also catch disabled statistics getting slower
+    def bench():
+        world, camera = scene(), bench_camera(size)
+        canvas = Canvas(size, size, dtype=precision)
+
+        def run():
+            with stats.collect() if collect else nullcontext():
+                render(world, camera, canvas, batch=batch, precision=precision)
+
+        return run, size * size, "rays/s"
+
+    return bench
+
+
+def antialiased_at(size: int) -> Benchmark:
+    # up to 16 samples per pixel; rays/s counts pixels, so compare it with
+    # render_batch_* to see what the extra edge samples cost
+    def bench():
+        world, camera = bench_world(), bench_camera(size)
+        canvas = Canvas(size, size)
+        run = lambda: render_antialiased(world, camera, canvas, 4, 16, batch=True)
+        return run, size * size, "rays/s"
+
+    return bench
+
+
+def render_cache_hit():
+    world, camera = bench_world(), bench_camera(128)
+    # run() keeps the directory alive; it is removed once run is dropped
+    directory = tempfile.TemporaryDirectory(prefix="raytracer-bench-")
+
+    def run():
+        return RenderCache(directory.name).render(
+            world, camera, Canvas(128, 128), batch=True
+        )
+
+    run()
+    return run, 128 * 128, "rays/s"
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "tuple_add": tuple_add,
+    "tuple_normalize": tuple_normalize,
+    "color_mul": color_mul,
+    "matrix_mul": matrix_mul,
+    "matrix_mul_tuple": matrix_mul_tuple,
+    "matrix_inverse": matrix_inverse,
+    "transform_chain": transform_chain,
+    "transform_builder": transform_builder,
+    "ray_transform": ray_transform,
+    "ray_transformed": ray_transformed,
+    "sphere_intersect": sphere_intersect,
+    "sphere_intersect_batch": sphere_intersect_batch,
+    "material_lighting": material_lighting,
+    "material_lighting_batch": material_lighting_batch,
+    "canvas_to_ppm": canvas_to_ppm,
+    "world_intersect_1000": world_intersect,
+    "world_nearest_hit_1000": world_nearest_hit,
+    "world_is_shadowed_1000": world_is_shadowed,
+}
+BENCHMARKS.update({f"render_{size}": render_at(size) for size in RENDER_SIZES})
+BENCHMARKS.update(
+    {f"render_batch_{size}": render_at(size, True) for size in RENDER_SIZES}
+)
+BENCHMARKS.update(
+    {f"render_antialiased_{size}": antialiased_at(size) for size in RENDER_SIZES}
+)
+BENCHMARKS.update(
+    {
+        f"render_batch_{size}_float32": render_at(size, True, precision="float32")
+        for size in RENDER_SIZES
+    }
+)
+BENCHMARKS["render_batch_spheres_128"] = render_at(128, True, scene=sphere_grid)
+BENCHMARKS["render_cache_hit_128"] = render_cache_hit
+BENCHMARKS.update(
+    {
+        "render_stats_32": render_at(32, collect=True),
+        "render_batch_stats_64": render_at(64, True, collect=True),
+    }
+)
+
+
+def measure(fn: Callable[[], object], repeat: int = 3) -> float:
+    # best seconds per call over `repeat` runs of at least ~0.2 s each
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_benchmarks(names: Optional[Sequence[str]] = None, repeat: int = 3) -> Results:
+    results: Results = {}
+    for name in names or BENCHMARKS:
+        fn, units, unit = BENCHMARKS[name]()
+        seconds = measure(fn, repeat)
+        results[name] = {"value": units / seconds, "unit": unit}
+    return results
+
+
+def precision_report(size: int = 128, repeat: int = 3) -> Dict[str, Any]:
+    # batched render of the bench scene at each precision: throughput, peak
+    # traced allocation of one render (framebuffer plus ray and shading
+    # arrays) and the largest difference from float64 in 8-bit levels
+    world, camera = bench_world(), bench_camera(size)
+    report: Dict[str, Any] = {}
+    images = {}
+    for name in DTYPES:
+        canvas = Canvas(size, size, dtype=name)
+        run = lambda: render(world, camera, canvas, batch=True, precision=name)
+        # warm up first so one-time allocations are not counted
+        run()
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        images[name] = quantize(canvas.pixels).astype(np.int16)
+        report[name] = {
+            "rays_per_second": size * size / measure(run, repeat),
+            "peak_bytes": peak,
+            "canvas_bytes": canvas.pixels.nbytes,
+        }
+    for name in DTYPES:
+        difference = np.abs(images[name] - images["float64"])
+        report[name]["max_deviation"] = int(difference.max())
+        report[name]["pixels_differing"] = int(difference.any(axis=2).sum())
+    return report
+
+
+def compare(
+    results: Results, baseline: Results, threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    # every metric is a throughput, so a regression is a drop below baseline
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["value"]
+        if result["value"] < expected * (1 - threshold):
+            change = result["value"] / expected - 1
+            regressions.append(f"{name}: {change:+.1%} vs baseline")
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the raytracer benchmarks.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--precision-report",
+        type=int,
+        metavar="SIZE",
+        help="compare float32 and float64 batched renders at SIZE and exit",
+    )
+    args = parser.parse_args(argv)
+    if args.precision_report:
+        report = precision_report(args.precision_report, args.repeat)
+        for name, row in report.items():
+            print(
+                f"{name:8s} {row['rays_per_second']:>12,.0f} rays/s"
+                f" {row['peak_bytes']:>12,} peak bytes"
+                f" {row['canvas_bytes']:>12,} canvas bytes"
+                f"  max deviation {row['max_deviation']}"
+                f" ({row['pixels_differing']} pixels)"
+            )
+        return 0
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.names, args.repeat)
+    for name, result in results.items():
+        print(f"{name:24s} {result['value']:>14,.0f} {result['unit']}")
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    # throughput depends on the machine, so there is no committed baseline;
+    # a missing one is an error rather than a silently skipped check
+    if not os.path.exists(args.baseline):
+        print(
+            f"No baseline at {args.baseline}; record one with --save-baseline",
+            file=sys.stderr,
+        )
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
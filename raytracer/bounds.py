@@ -0,0 +1,42 @@
+from typing import Iterable
+
+import numpy as np
+
+from raytracer.matrix import Matrix
+
+
+class Bounds:
+    def __init__(self, minimum: Iterable[float], maximum: Iterable[float]):
+        self.minimum = np.array(minimum, dtype=np.float64)
+        self.maximum = np.array(maximum, dtype=np.float64)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Bounds):
+            return NotImplemented
+        return np.allclose(self.minimum, other.minimum) and np.allclose(
+            self.maximum, other.maximum
+        )
+
+    def corners(self) -> np.ndarray:
+        # all eight (x, y, z) combinations of the minimum and maximum
+        lo, hi = self.minimum, self.maximum
+        return np.array(
+            [
+                [x, y, z]
+                for x in (lo[0], hi[0])
+                for y in (lo[1], hi[1])
+                for z in (lo[2], hi[2])
+            ]
+        )
+
+    def transform(self, matrix: Matrix) -> "Bounds":
+        m = np.array(matrix.grid, dtype=np.float64)
+        corners = self.corners() @ m[:3, :3].T + m[:3, 3]
+        return Bounds(corners.min(axis=0), corners.max(axis=0))
+
+    def centroid(self) -> np.ndarray:
+        return (self.minimum + self.maximum) / 2
+
+    def surface_area(self) -> float:
+        dx, dy, dz = self.maximum - self.minimum
+        return 2 * (dx * dy + dy * dz + dz * dx)
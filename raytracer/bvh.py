@@ -0,0 +1,248 @@
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from raytracer.ray import Ray
+from raytracer.shape import Shape
+
+INF = float("inf")
+
+# index into the stacked (minimum, maximum) pair for each of the 8 box corners
+CORNERS = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+
+
+def world_bounds(shapes: Sequence[Shape]) -> np.ndarray:
+    # (n, 2, 3) array of world-space (minimum, maximum) for every shape,
+    # transforming all box corners in one batched product
+    local = np.array([(b.minimum, b.maximum) for b in (s.bounds() for s in shapes)])
+    transforms = np.array([s.transform.grid for s in shapes], dtype=np.float64)
+    corners = local[:, CORNERS, [0, 1, 2]]
+    world = np.einsum("nij,nkj->nki", transforms[:, :3, :3], corners)
+    world += transforms[:, None, :3, 3]
+    return np.stack([world.min(axis=1), world.max(axis=1)], axis=1)
+
+
+def surface_areas(minimum: np.ndarray, maximum: np.ndarray) -> np.ndarray:
+    d = np.maximum(maximum - minimum, 0)
+    return 2 * (d[..., 0] * d[..., 1] + d[..., 1] * d[..., 2] + d[..., 2] * d[..., 0])
+
+
+class BVH:
+    def __init__(self, shapes: Sequence[Shape], leaf_size: int = 4, bins: int = 16):
+        self.leaf_size = leaf_size
+        self.bins = bins
+        # flat node arrays; a node with count > 0 is a leaf holding
+        # self.shapes[first:first + count], otherwise `first` is the index of
+        # its left child and the right child follows at `first + 1`
+        self.boxes: List[Tuple[float, float, float, float, float, float]] = []
+        self.first: List[int] = []
+        self.count: List[int] = []
+        self.shapes: List[Shape] = []
+        # shape intersection tests made by nearest() and any_hit(), for
+        # render statistics
+        self.tests = 0
+        # index of each entry of self.shapes in the sequence passed in
+        self.ids: List[int] = []
+        if shapes:
+            self._build(list(shapes), world_bounds(shapes))
+
+    def _add_node(self, box: np.ndarray) -> int:
+        self.boxes.append(tuple(box[0].tolist() + box[1].tolist()))  # type: ignore
+        self.first.append(0)
+        self.count.append(0)
+        return len(self.boxes) - 1
+
+    def _build(self, shapes: List[Shape], bounds: np.ndarray):
+        centroids = bounds.mean(axis=1)
+        root = np.arange(len(shapes))
+        stack = [(self._add_node(self._enclose(bounds, root)), root)]
+        while stack:
+            node, indices = stack.pop()
+            split = self._split(bounds, centroids, indices)
+            if split is None:
+                self.first[node] = len(self.shapes)
+                self.count[node] = len(indices)
+                self.shapes.extend(shapes[i] for i in indices)
+                self.ids.extend(indices.tolist())
+                continue
+            left, right = split
+            self.first[node] = len(self.boxes)
+            left_node = self._add_node(self._enclose(bounds, left))
+            right_node = self._add_node(self._enclose(bounds, right))
+            stack.append((right_node, right))
+            stack.append((left_node, left))
+
+    @staticmethod
+    def _enclose(bounds: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        return np.stack(
+            [bounds[indices, 0].min(axis=0), bounds[indices, 1].max(axis=0)]
+        )
+
+    def _split(self, bounds: np.ndarray, centroids: np.ndarray, indices: np.ndarray):
+        # binned surface area heuristic along the widest centroid axis
+        if len(indices) <= self.leaf_size:
+            return None
+        c = centroids[indices]
+        low, high = c.min(axis=0), c.max(axis=0)
+        axis = int(np.argmax(high - low))
+        extent = high[axis] - low[axis]
+        if extent <= 0:
+            return None
+
+        bins = self.bins
+        index = ((c[:, axis] - low[axis]) / extent * bins).astype(int)
+        np.minimum(index, bins - 1, out=index)
+        counts = np.bincount(index, minlength=bins)
+        bin_min = np.full((bins, 3), np.inf)
+        bin_max = np.full((bins, 3), -np.inf)
+        np.minimum.at(bin_min, index, bounds[indices, 0])
+        np.maximum.at(bin_max, index, bounds[indices, 1])
+
+        # cost of splitting after bin k for k in 0..bins-2
+        left_min = np.minimum.accumulate(bin_min)[:-1]
+        left_max = np.maximum.accumulate(bin_max)[:-1]
+        right_min = np.minimum.accumulate(bin_min[::-1])[::-1][1:]
+        right_max = np.maximum.accumulate(bin_max[::-1])[::-1][1:]
+        left_count = np.cumsum(counts)[:-1]
+        right_count = len(indices) - left_count
+        cost = (
+            surface_areas(left_min, left_max) * left_count
+            + surface_areas(right_min, right_max) * right_count
+        )
+        cost[(left_count == 0) | (right_count == 0)] = np.inf
+        best = int(np.argmin(cost))
+        if not np.isfinite(cost[best]):
+            return None
+        mask = index <= best
+        return indices[mask], indices[~mask]
+
+    def candidate_slots(self, ray: Ray, t_min: float = 0.0) -> Iterator[int]:
+        # positions in self.shapes of shapes whose world bounds the ray
+        # overlaps at some t >= t_min; pass -INF for every shape on the
+        # ray's line, including those behind its origin
+        if not self.boxes:
+            return
+        origin, direction, inverse = ray_parameters(ray)
+        boxes, first, count = self.boxes, self.first, self.count
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if slab_entry(origin, direction, inverse, boxes[node], t_min, INF) == INF:
+                continue
+            n = count[node]
+            if n:
+                yield from range(first[node], first[node] + n)
+            else:
+                stack.append(first[node] + 1)
+                stack.append(first[node])
+
+    def candidates(self, ray: Ray, t_min: float = 0.0) -> Iterator[Shape]:
+        shapes = self.shapes
+        return (shapes[slot] for slot in self.candidate_slots(ray, t_min))
+
+    def nearest(
+        self, ray: Ray, t_min: float = 0.0, t_max: float = INF
+    ) -> Tuple[float, int]:
+        # closest t in [t_min, t_max] and the slot of the shape it belongs
+        # to, or (t_max, -1); children are visited front to back and nodes
+        # entered beyond the best hit so far are skipped
+        best_t, best = t_max, -1
+        if not self.boxes:
+            return best_t, best
+        tests = 0
+        origin, direction, inverse = ray_parameters(ray)
+        boxes, first, count, shapes = self.boxes, self.first, self.count, self.shapes
+        entry = slab_entry(origin, direction, inverse, boxes[0], t_min, t_max)
+        stack = [(entry, 0)] if entry != INF else []
+        while stack:
+            entry, node = stack.pop()
+            if entry > best_t:
+                continue
+            n = count[node]
+            if n:
+                tests += n
+                for slot in range(first[node], first[node] + n):
+                    ts = shapes[slot].intersect_ts(ray)
+                    if ts is None:
+                        continue
+                    t = ts[0] if ts[0] >= t_min else ts[1]
+                    if t_min <= t <= best_t and (best < 0 or t < best_t):
+                        best_t, best = t, slot
+                continue
+            left, right = first[node], first[node] + 1
+            left_entry = slab_entry(
+                origin, direction, inverse, boxes[left], t_min, best_t
+            )
+            right_entry = slab_entry(
+                origin, direction, inverse, boxes[right], t_min, best_t
+            )
+            if left_entry <= right_entry:
+                if right_entry != INF:
+                    stack.append((right_entry, right))
+                if left_entry != INF:
+                    stack.append((left_entry, left))
+            else:
+                if left_entry != INF:
+                    stack.append((left_entry, left))
+                stack.append((right_entry, right))
+        self.tests += tests
+        return best_t, best
+
+    def any_hit(self, ray: Ray, t_min: float = 0.0, t_max: float = INF) -> bool:
+        # whether any shape is hit at some t in [t_min, t_max]; unlike
+        # nearest() this stops at the first blocker found, in any order
+        if not self.boxes:
+            return False
+        origin, direction, inverse = ray_parameters(ray)
+        boxes, first, count, shapes = self.boxes, self.first, self.count, self.shapes
+        tests = 0
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            box = boxes[node]
+            if slab_entry(origin, direction, inverse, box, t_min, t_max) == INF:
+                continue
+            n = count[node]
+            if not n:
+                stack.append(first[node] + 1)
+                stack.append(first[node])
+                continue
+            for slot in range(first[node], first[node] + n):
+                tests += 1
+                ts = shapes[slot].intersect_ts(ray)
+                if ts is not None and (
+                    t_min <= ts[0] <= t_max or t_min <= ts[1] <= t_max
+                ):
+                    self.tests += tests
+                    return True
+        self.tests += tests
+        return False
+
+
+def ray_parameters(ray: Ray):
+    origin = (ray.origin.x, ray.origin.y, ray.origin.z)
+    direction = (ray.direction.x, ray.direction.y, ray.direction.z)
+    inverse = [1 / d if d != 0 else 0.0 for d in direction]
+    return origin, direction, inverse
+
+
+def slab_entry(origin, direction, inverse, box, t_min: float, t_max: float) -> float:
+    # t at which the ray enters the box within [t_min, t_max], INF on a miss
+    t_near, t_far = t_min, t_max
+    for axis in range(3):
+        o = origin[axis]
+        if direction[axis] == 0:
+            if o < box[axis] or o > box[axis + 3]:
+                return INF
+            continue
+        t0 = (box[axis] - o) * inverse[axis]
+        t1 = (box[axis + 3] - o) * inverse[axis]
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_near:
+            t_near = t0
+        if t1 < t_far:
+            t_far = t1
+        if t_near > t_far:
+            return INF
+    return t_near
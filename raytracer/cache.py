@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from raytracer import stats
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas
+from raytracer.matrix import Matrix
+from raytracer.precision import resolve
+from raytracer.render import render
+from raytracer.tuple import Tuple
+from raytracer.world import World
+
+DEFAULT_MAX_BYTES = 1 << 30
+# render options that change how the work is split up but not the pixels
+IGNORED_OPTIONS = frozenset({"workers", "tile", "chunk"})
+
+
+def tuple_fields(t: Tuple) -> List[float]:
+    return [t.x, t.y, t.z, t.w]
+
+
+def matrix_fields(m: Matrix) -> List[List[float]]:
+    return [[float(value) for value in row] for row in m.grid]
+
+
+def describe_scene(
+    world: World, camera: Camera, canvas: Canvas, options: Dict[str, Any]
+) -> Dict[str, Any]:
+    # everything that determines the rendered pixels, as plain JSON values
+    return {
+        "objects": [
+            {
+                "type": type(shape).__name__,
+                "transform": matrix_fields(shape.transform),
+                "material": {
+                    "color": tuple_fields(shape.material.color),
+                    "ambient": shape.material.ambient,
+                    "diffuse": shape.material.diffuse,
+                    "specular": shape.material.specular,
+                    "shininess": shape.material.shininess,
+                },
+            }
+            for shape in world.objects
+        ],
+        "lights": [
+            {
+                "position": tuple_fields(light.position),
+                "intensity": tuple_fields(light.intensity),
+            }
+            for light in world.lights
+        ],
+        "camera": {
+            "hsize": camera.hsize,
+            "vsize": camera.vsize,
+            "field_of_view": camera.field_of_view,
+            "transform": matrix_fields(camera.transform),
+        },
+        "canvas": {
+            "width": canvas.width,
+            "height": canvas.height,
+            "dtype": canvas.pixels.dtype.str,
+        },
+        "options": {
+            **{
+                name: value
+                for name, value in sorted(options.items())
+                if name not in IGNORED_OPTIONS
+            },
+            # the batched math runs at the default precision unless told
+            # otherwise, so the resolved one is always part of the key
+            "precision": resolve(options.get("precision")).name,
+        },
+    }
+
+
+def scene_key(
+    world: World, camera: Camera, canvas: Canvas, options: Dict[str, Any]
+) -> str:
+    # floats are serialized with repr() by json, so equal scenes always
+    # produce the same text and therefore the same hash
+    description = describe_scene(world, camera, canvas, options)
+    text = json.dumps(description, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def touch(path: str):
+    # nanosecond timestamps keep the LRU order exact even for files used
+    # within the same filesystem clock tick
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+class RenderCache:
+    # Finished framebuffers stored as <key>.npy files in `directory`. Hits are
+    # memory-mapped rather than read, and a file's modification time records
+    # its last use so that the least recently used files are evicted first
+    # once the directory grows past `max_bytes`.
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self.path(key)
+        try:
+            # copy-on-write, so the canvas stays writable and writes to it
+            # never reach the cached file
+            pixels = np.load(path, mmap_mode="c")
+        except (ValueError, OSError):
+            return None
+        touch(path)
+        return pixels
+
+    def put(self, key: str, pixels: np.ndarray):
+        # written to a temporary file and renamed so that readers never see
+        # a partial framebuffer
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, pixels)
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        touch(self.path(key))
+        self.evict()
+
+    def entries(self) -> List[os.DirEntry]:
+        # cached framebuffers, least recently used first
+        with os.scandir(self.directory) as scan:
+            files = [entry for entry in scan if entry.name.endswith(".npy")]
+        return sorted(files, key=lambda entry: entry.stat().st_mtime_ns)
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def render(
+        self,
+        world: World,
+        camera: Camera,
+        canvas: Canvas,
+        render_fn: Callable[..., Any] = render,
+        **options,
+    ) -> Canvas:
+        # render_fn(world, camera, canvas, **options) unless an identical
+        # scene was rendered before; on a hit canvas.pixels becomes a
+        # copy-on-write memory map of the cached framebuffer
+        key = scene_key(
+            world, camera, canvas, {"render": render_fn.__name__, **options}
+        )
+        pixels = self.get(key)
+        if pixels is not None and pixels.shape == canvas.pixels.shape:
+            stats.count("cache_hits")
+            canvas.pixels = pixels
+            return canvas
+        stats.count("cache_misses")
+        render_fn(world, camera, canvas, **options)
+        self.put(key, canvas.pixels)
+        return canvas
@@ -0,0 +1,96 @@
+from math import tan
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from raytracer.matrix import Matrix
+from raytracer.precision import Precision, resolve
+from raytracer.ray import Ray
+from raytracer.transformation import Transform, matrix_and_inverse
+from raytracer.tuple import Point, Vector
+
+
+class Camera:
+    def __init__(self, hsize: int, vsize: int, field_of_view: float):
+        self.hsize = hsize
+        self.vsize = vsize
+        self.field_of_view = field_of_view
+        self.transform = Matrix.identity()
+
+        half_view = tan(field_of_view / 2)
+        aspect = hsize / vsize
+        if aspect >= 1:
+            self.half_width = half_view
+            self.half_height = half_view / aspect
+        else:
+            self.half_width = half_view * aspect
+            self.half_height = half_view
+        self.pixel_size = self.half_width * 2 / hsize
+
+    @property
+    def transform(self) -> Matrix:
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform: Union[Matrix, Transform]):
+        self._transform, self.inverse = matrix_and_inverse(transform)
+        self.inverse_array = np.array(self.inverse.grid, dtype=np.float64)
+
+    def ray_for_pixel(self, px: int, py: int) -> Ray:
+        # offset from the edge of the canvas to the pixel's center
+        world_x = self.half_width - (px + 0.5) * self.pixel_size
+        world_y = self.half_height - (py + 0.5) * self.pixel_size
+        pixel = self.inverse * Point(world_x, world_y, -1)
+        origin = self.inverse * Point(0, 0, 0)
+        direction = (pixel - origin).normalize()
+        return Ray(
+            Point(origin.x, origin.y, origin.z),
+            Vector(direction.x, direction.y, direction.z),
+        )
+
+    def rays_for_rows(
+        self,
+        y0: int,
+        y1: int,
+        x0: int = 0,
+        x1: Optional[int] = None,
+        precision: Precision = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # (N, 3) origins and unit directions for pixels y0 <= y < y1 (and
+        # x0 <= x < x1), in row-major order
+        xs = np.arange(x0, self.hsize if x1 is None else x1)
+        return self.rays_for_grid(xs, np.arange(y0, y1), precision)
+
+    def rays_for_grid(
+        self, xs: np.ndarray, ys: np.ndarray, precision: Precision = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # rays through every pixel (x, y) with x in xs and y in ys, in
+        # row-major order
+        pixels = np.empty((len(ys), len(xs), 4), dtype=resolve(precision))
+        pixels[:, :, 0] = self.half_width - (xs + 0.5) * self.pixel_size
+        pixels[:, :, 1] = (self.half_height - (ys + 0.5) * self.pixel_size)[:, None]
+        pixels[:, :, 2] = -1
+        pixels[:, :, 3] = 1
+        return self.rays_through_canvas(pixels.reshape(-1, 4))
+
+    def rays_for_points(
+        self, xs: np.ndarray, ys: np.ndarray, precision: Precision = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # rays through arbitrary canvas positions (xs[i], ys[i]), measured in
+        # pixels from the top left corner, so pixel (x, y) spans [x, x + 1)
+        pixels = np.empty((len(xs), 4), dtype=resolve(precision))
+        pixels[:, 0] = self.half_width - xs * self.pixel_size
+        pixels[:, 1] = self.half_height - ys * self.pixel_size
+        pixels[:, 2] = -1
+        pixels[:, 3] = 1
+        return self.rays_through_canvas(pixels)
+
+    def rays_through_canvas(self, pixels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # (N, 4) points on the canvas plane z = -1 in camera space; the rays
+        # come out at the precision of `pixels`
+        inverse = self.inverse_array.astype(pixels.dtype)
+        origin = inverse[:3, 3]
+        directions = pixels @ inverse[:3].T - origin
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+        origins = np.repeat(origin[None, :], len(directions), axis=0)
+        return origins, directions
@@ -1,39 +1,168 @@
-from math import ceil
-from typing import List
+import io
+import os
+import struct
+import tempfile
+from typing import IO, List, Optional
+import zlib
+
+import numpy as np
+
+from raytracer import stats
+from raytracer.precision import Precision, resolve
 from raytracer.tuple import Color
 
+MAX_PPM_LINE_LENGTH: int = 70
+PNG_SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+CHANNEL_STRINGS: List[str] = [str(value) for value in range(256)]
+
+
+def quantize(pixels: np.ndarray) -> np.ndarray:
+    return np.clip(np.ceil(pixels * 255), 0, 255).astype(np.uint8)
+
+
+def wrap_ppm_line(line: str) -> List[str]:
+    # break at the last space that keeps each line within the limit
+    lines: List[str] = []
+    start = 0
+    while len(line) - start > MAX_PPM_LINE_LENGTH:
+        end = line.rfind(" ", start, start + MAX_PPM_LINE_LENGTH + 1)
+        lines.append(line[start:end])
+        start = end + 1
+    lines.append(line[start:])
+    return lines
+
+
+def png_chunk(tag: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(tag + data)
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
 
 class Canvas:
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, dtype: Precision = None):
         self.width: int = width
         self.height: int = height
-        self.grid: List[List[Color]] = [
-            [Color(0, 0, 0) for _ in range(height)] for _ in range(width)
-        ]
+        # row-major framebuffer: pixels[y, x] holds the (red, green, blue) channels
+        self.pixels: np.ndarray = np.zeros((height, width, 3), dtype=resolve(dtype))
 
     def write_pixel(self, x: int, y: int, color: Color):
-        self.grid[x][y] = color
+        self.pixels[y, x] = (color.red, color.green, color.blue)
 
     def pixel_at(self, x: int, y: int) -> Color:
-        return self.grid[x][y]
+        red, green, blue = self.pixels[y, x].tolist()
+        return Color(red, green, blue)
+
+    def write_rows(self, y: int, rows: np.ndarray):
+        rows = np.asarray(rows)
+        if rows.shape[1:] != (self.width, 3):
+            raise ValueError("Rows must have shape (n, width, 3)!")
+        self.pixels[y : y + len(rows)] = rows
+
+    def write_block(self, x: int, y: int, block: np.ndarray):
+        block = np.asarray(block)
+        if block.ndim != 3 or block.shape[2] != 3:
+            raise ValueError("Block must have shape (h, w, 3)!")
+        height, width = block.shape[:2]
+        self.pixels[y : y + height, x : x + width] = block
+
+    @stats.timed("encoding")
+    def write_ppm(self, fileobj: IO, rows_per_chunk: int = 64):
+        text = isinstance(fileobj, io.TextIOBase)
+        write = fileobj.write if text else lambda s: fileobj.write(s.encode("ascii"))
+
+        write(f"P3\n{self.width} {self.height}\n255\n")
+        for y in range(0, self.height, rows_per_chunk):
+            values = quantize(self.pixels[y : y + rows_per_chunk])
+            lines: List[str] = []
+            for row in values.reshape(len(values), -1).tolist():
+                lines.extend(
+                    wrap_ppm_line(" ".join(map(CHANNEL_STRINGS.__getitem__, row)))
+                )
+            write("\n".join(lines) + "\n")
 
     def to_ppm(self) -> str:
-        max_line_length: int = 70
-        ppm: str = f"P3\n{self.width} {self.height}\n255\n"
-        clamp = lambda x: min(255, max(0, ceil(x * 255)))
-
-        for y in range(self.height):
-            line: str = ""
-            for x in range(self.width):
-                pixel = self.pixel_at(x, y)
-                rgb_values = [clamp(pixel.red), clamp(pixel.green), clamp(pixel.blue)]
-                for value in rgb_values:
-                    value_str: str = str(value)
-                    if len(line) + len(value_str) > max_line_length:
-                        ppm += line.rstrip() + "\n"
-                        line = ""
-                    line += value_str + " "
-
-            ppm += line.rstrip() + "\n"
-
-        return ppm
+        ppm = io.StringIO()
+        self.write_ppm(ppm)
+        return ppm.getvalue()
+
+    @stats.timed("encoding")
+    def write_p6(self, fileobj: IO[bytes], rows_per_chunk: int = 64):
+        fileobj.write(f"P6\n{self.width} {self.height}\n255\n".encode("ascii"))
+        for y in range(0, self.height, rows_per_chunk):
+            fileobj.write(quantize(self.pixels[y : y + rows_per_chunk]).tobytes())
+
+    def to_p6(self) -> bytes:
+        p6 = io.BytesIO()
+        self.write_p6(p6)
+        return p6.getvalue()
+
+    @stats.timed("encoding")
+    def write_png(self, fileobj: IO[bytes], rows_per_chunk: int = 64):
+        fileobj.write(PNG_SIGNATURE)
+        # 8-bit truecolor, default compression/filter methods, no interlacing
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        fileobj.write(png_chunk(b"IHDR", header))
+        compressor = zlib.compressobj()
+        for y in range(0, self.height, rows_per_chunk):
+            values = quantize(self.pixels[y : y + rows_per_chunk])
+            # every scanline starts with filter type 0 (None)
+            scanlines = np.zeros((len(values), 1 + self.width * 3), dtype=np.uint8)
+            scanlines[:, 1:] = values.reshape(len(values), -1)
+            data = compressor.compress(scanlines.tobytes())
+            if data:
+                fileobj.write(png_chunk(b"IDAT", data))
+        fileobj.write(png_chunk(b"IDAT", compressor.flush()))
+        fileobj.write(png_chunk(b"IEND", b""))
+
+    def to_png(self) -> bytes:
+        png = io.BytesIO()
+        self.write_png(png)
+        return png.getvalue()
+
+
+class MemmapCanvas(Canvas):
+    # A canvas whose framebuffer is a .npy file mapped into memory, for images
+    # too large to hold in RAM. Tiles are written straight into the mapping and
+    # the encoders read it back rows_per_chunk rows at a time, so only the
+    # pages being touched need to be resident. Without a path the file is a
+    # temporary one, deleted by close().
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        path: Optional[str] = None,
+        dtype: Precision = None,
+    ):
+        self.width = width
+        self.height = height
+        self.temporary = path is None
+        self.writable = True
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="canvas-", suffix=".npy")
+            os.close(fd)
+        self.path: str = path
+        self.pixels = np.lib.format.open_memmap(
+            path, mode="w+", dtype=resolve(dtype), shape=(height, width, 3)
+        )
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False) -> "MemmapCanvas":
+        # maps an existing framebuffer file, e.g. one written by a previous
+        # render or by RenderCache, without reading it. The mapping is
+        # copy-on-write so drawing on the canvas leaves the file alone; pass
+        # writable=True to write through, e.g. to resume a render in place.
+        canvas = cls.__new__(cls)
+        canvas.pixels = np.load(path, mmap_mode="r+" if writable else "c")
+        canvas.height, canvas.width = canvas.pixels.shape[:2]
+        canvas.path = path
+        canvas.temporary = False
+        canvas.writable = writable
+        return canvas
+
+    def flush(self):
+        self.pixels.flush()
+
+    def close(self):
+        self.flush()
+        del self.pixels
+        if self.temporary:
+            os.unlink(self.path)
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import os
+import sys
+from contextlib import nullcontext
+from typing import Optional, Sequence, Tuple
+
+from raytracer import stats
+from raytracer.precision import DTYPES
+from raytracer.scene import BATCH_MAX_OBJECTS, load_scene_file
+from raytracer.server import serve
+
+EXTENSIONS = {"ppm": ".ppm", "p6": ".ppm", "png": ".png"}
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    # "512" for a square image or "640x480"
+    width, _, height = text.lower().partition("x")
+    try:
+        size = int(width), int(height or width)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+    if min(size) < 1:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+    return size
+
+
+def render_command(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    scene = load_scene_file(args.scene)
+    sizes = args.size or [(scene.camera.hsize, scene.camera.vsize)]
+    output = args.output
+    if output is None:
+        stem = os.path.splitext(os.path.basename(args.scene))[0]
+        suffix = "-{width}x{height}" if len(sizes) > 1 else ""
+        output = stem + suffix + EXTENSIONS[args.format]
+    elif len(sizes) > 1 and "{" not in output:
+        parser.error("--output needs {width} and {height} to render several sizes")
+
+    batch = scene.batch if args.path == "auto" else args.path == "batch"
+    # one loaded and compiled scene serves every requested size
+    with stats.collect() if args.stats else nullcontext() as collector:
+        for width, height in sizes:
+            canvas = scene.render(
+                (width, height),
+                workers=args.workers,
+                batch=batch,
+                precision=args.precision,
+            )
+            path = output.format(width=width, height=height)
+            with open(path, "wb") as f:
+                getattr(canvas, f"write_{args.format}")(f)
+            print(path)
+    if collector is not None:
+        print(collector.to_json(indent=2))
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    asyncio.run(
+        serve(args.socket, args.workers, args.max_jobs, args.queue_size, args.scene_dir)
+    )
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="raytracer")
+    commands = parser.add_subparsers(dest="command", required=True)
+    render = commands.add_parser("render", help="render a JSON scene file")
+    render.add_argument("scene")
+    render.add_argument(
+        "--size",
+        type=parse_size,
+        action="append",
+        help="N or WxH (default: the scene camera's); repeat for several sizes",
+    )
+    render.add_argument("--workers", type=int, default=1)
+    render.add_argument("--format", choices=list(EXTENSIONS), default="png")
+    render.add_argument(
+        "--output", help="output file, may use {width} and {height} placeholders"
+    )
+    render.add_argument(
+        "--path",
+        choices=["auto", "batch", "bvh"],
+        default="auto",
+        help="batched array math or per-ray BVH traversal (default: batched "
+        f"for scenes of up to {BATCH_MAX_OBJECTS} objects)",
+    )
+    render.add_argument(
+        "--precision",
+        choices=list(DTYPES),
+        default="float64",
+        help="float type of the framebuffer and batched ray math",
+    )
+    render.add_argument(
+        "--stats", action="store_true", help="print render statistics as JSON"
+    )
+    serve = commands.add_parser(
+        "serve", help="run a JSON-lines render job server on stdio or a socket"
+    )
+    serve.add_argument("--socket", help="listen on this Unix socket, not stdio")
+    serve.add_argument("--workers", type=int, help="pool size (default: CPUs)")
+    serve.add_argument("--max-jobs", type=int, default=2)
+    serve.add_argument("--queue-size", type=int, default=16)
+    serve.add_argument(
+        "--scene-dir",
+        help="directory that scene_file requests may read from (default: the "
+        "working directory on stdio, none on a socket)",
+    )
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        return serve_command(args)
+    return render_command(args, render)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
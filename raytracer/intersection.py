@@ -1,14 +1,51 @@
-from typing import List, Optional
+from array import array
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from raytracer.shape import Shape
 
 
 class Intersection:
-    def __init__(self, t: float, object: object):
+    def __init__(self, t: float, object: "Shape"):
         self.t = t
         self.object = object
 
 
 def hit(xs: List[Intersection]) -> Optional[Intersection]:
-    positive_intersections = [x for x in xs if x.t >= 0]
-    if not positive_intersections:
-        return None
-    return min([x for x in positive_intersections], key=lambda x: x.t)
+    nearest = None
+    for x in xs:
+        if x.t >= 0 and (nearest is None or x.t < nearest.t):
+            nearest = x
+    return nearest
+
+
+class IntersectionBuffer:
+    # structure-of-arrays intersection list meant to be cleared and refilled
+    # for every ray; grows by doubling and never shrinks
+    def __init__(self, capacity: int = 16):
+        self.t = array("d", bytes(8 * capacity))
+        self.object_ids = array("q", bytes(8 * capacity))
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def append(self, t: float, object_id: int):
+        if self.count == len(self.t):
+            self.t.extend(self.t)
+            self.object_ids.extend(self.object_ids)
+        self.t[self.count] = t
+        self.object_ids[self.count] = object_id
+        self.count += 1
+
+    def nearest(self, t_min: float = 0.0) -> int:
+        # index of the smallest t >= t_min, or -1
+        t = self.t
+        best = -1
+        for i in range(self.count):
+            if t[i] >= t_min and (best < 0 or t[i] < t[best]):
+                best = i
+        return best
@@ -1,4 +1,9 @@
+from typing import Optional
+
+import numpy as np
+
 from raytracer.light import Light
+from raytracer.precision import as_float
 from raytracer.tuple import Color, Point, Vector
 
 
@@ -22,11 +27,18 @@ class Material:
         )
 
     def lighting(
-        self, light: Light, point: Point, eyev: Vector, normalv: Vector
+        self,
+        light: Light,
+        point: Point,
+        eyev: Vector,
+        normalv: Vector,
+        in_shadow: bool = False,
     ) -> Color:
         effective_color = self.color * light.intensity
-        lightv = (light.position - point).normalize()
         ambient = effective_color * self.ambient
+        if in_shadow:
+            return ambient
+        lightv = (light.position - point).normalize()
         light_dot_normal = lightv.dot(normalv)
         if light_dot_normal < 0:
             diffuse = Color(0, 0, 0)
@@ -41,3 +53,49 @@ class Material:
                 factor = reflect_dot_eye ** self.shininess
                 specular = light.intensity * self.specular * factor
         return ambient + diffuse + specular
+
+    def lighting_batch(
+        self,
+        light: Light,
+        points: np.ndarray,
+        eyevs: np.ndarray,
+        normals: np.ndarray,
+        in_shadow: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        # lighting() for (N, 3) arrays of points, eye and normal vectors and
+        # an optional (N,) shadow mask; the branches of the scalar version
+        # become masks
+        points = as_float(points)[:, :3]
+        eyevs = as_float(eyevs)[:, :3]
+        normals = as_float(normals)[:, :3]
+        dtype = np.result_type(points, eyevs, normals)
+        intensity = np.array(
+            [light.intensity.red, light.intensity.green, light.intensity.blue],
+            dtype=dtype,
+        )
+        color = np.array(
+            [self.color.red, self.color.green, self.color.blue], dtype=dtype
+        )
+        effective_color = color * intensity
+
+        position = light.position
+        lightv = np.array([position.x, position.y, position.z], dtype=dtype) - points
+        length = np.linalg.norm(lightv, axis=1)
+        lightv /= np.where(length == 0, 1, length)[:, None]
+
+        light_dot_normal = np.einsum("ij,ij->i", lightv, normals)
+        lit = light_dot_normal >= 0
+        if in_shadow is not None:
+            lit &= ~in_shadow
+        # -reflect(lightv, normal) = 2 * (lightv . normal) * normal - lightv
+        reflectv = 2 * light_dot_normal[:, None] * normals - lightv
+        reflect_dot_eye = np.einsum("ij,ij->i", reflectv, eyevs)
+        shiny = lit & (reflect_dot_eye > 0)
+        factor = np.where(shiny, reflect_dot_eye, 0) ** self.shininess
+
+        ambient = effective_color * self.ambient
+        diffuse = np.where(lit, light_dot_normal, 0)[:, None] * (
+            effective_color * self.diffuse
+        )
+        specular = np.where(shiny, factor, 0)[:, None] * (intensity * self.specular)
+        return ambient + diffuse + specular
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Optional, Union, overload
 
 import numpy as np
 
@@ -14,6 +14,10 @@ from raytracer.tuple import Tuple, nearly_equal
 
 
 class Matrix:
+    # total number of inverse() calls, for checking that renders invert
+    # per object and not per ray
+    inversions: int = 0
+
     @classmethod
     def zeros(cls, rows: int, cols: int) -> "Matrix":
         return cls([[0.0 for _ in range(cols)] for _ in range(rows)])
@@ -26,6 +30,7 @@ class Matrix:
         self.grid = grid
         self.rows: int = len(grid)
         self.cols: int = len(grid[0])
+        self._affine: Optional[tuple[float, ...]] = None
 
     def __getitem__(self, index: tuple) -> float:
         return self.grid[index[0]][index[1]]
@@ -40,6 +45,12 @@ class Matrix:
                     return False
         return True
 
+    @overload
+    def __mul__(self, other: "Matrix") -> "Matrix": ...
+
+    @overload
+    def __mul__(self, other: Tuple) -> Tuple: ...
+
     def __mul__(self, other: Union[Tuple, "Matrix"]) -> Union[Tuple, "Matrix"]:
         if isinstance(other, Matrix):
             if self.cols != other.rows:
@@ -83,6 +94,8 @@ class Matrix:
         )
 
     def determinant(self) -> float:
+        if self.rows == 4 and self.cols == 4:
+            return determinant_4x4(self.grid)
         return np.linalg.det(self.grid)
 
     def submatrix(self, row: int, col: int) -> "Matrix":
@@ -104,14 +117,36 @@ class Matrix:
     def is_invertible(self) -> bool:
         return self.determinant() != 0
 
+    def affine(self) -> tuple[float, ...]:
+        # the top three rows flattened to 12 floats, computed on first use;
+        # the grid must not be modified afterwards
+        if self._affine is None:
+            if self.rows != 4 or self.cols != 4:
+                raise ValueError("Matrix dimensions do not match!")
+            self._affine = tuple(float(v) for row in self.grid[:3] for v in row)
+        return self._affine
+
+    def is_affine(self) -> bool:
+        return self.rows == 4 and self.cols == 4 and tuple(self.grid[3]) == (0, 0, 0, 1)
+
     def inverse(self) -> "Matrix":
-        if not self.is_invertible():
+        if self.rows == 4 and self.cols == 4:
+            if self.is_affine():
+                grid = affine_inverse_4x4(self.grid)
+            else:
+                grid = inverse_4x4(self.grid)
+            Matrix.inversions += 1
+            return Matrix(grid)
+
+        determinant = self.determinant()
+        if determinant == 0:
             raise ValueError("Matrix is not invertible!")
 
+        Matrix.inversions += 1
         m2 = Matrix.zeros(self.rows, self.cols)
         for row in range(self.rows):
             for col in range(self.cols):
-                m2.grid[col][row] = self.cofactor(row, col) / self.determinant()
+                m2.grid[col][row] = self.cofactor(row, col) / determinant
         return m2
 
     def translate(self, x, y, z):
@@ -137,3 +172,90 @@ class Matrix:
     def shear(self, xy, xz, yx, yz, zx, zy):
         self = Matrix(shearing_matrix(xy, xz, yx, yz, zx, zy)) * self
         return self
+
+
+# Closed-form 4x4 determinant and inverse. The 2x2 determinants of the top
+# two rows (s0..s5) and bottom two rows (c0..c5) are shared by the
+# determinant and all sixteen cofactors.
+def determinant_4x4(m: List[List[float]]) -> float:
+    s0 = m[0][0] * m[1][1] - m[1][0] * m[0][1]
+    s1 = m[0][0] * m[1][2] - m[1][0] * m[0][2]
+    s2 = m[0][0] * m[1][3] - m[1][0] * m[0][3]
+    s3 = m[0][1] * m[1][2] - m[1][1] * m[0][2]
+    s4 = m[0][1] * m[1][3] - m[1][1] * m[0][3]
+    s5 = m[0][2] * m[1][3] - m[1][2] * m[0][3]
+    c5 = m[2][2] * m[3][3] - m[3][2] * m[2][3]
+    c4 = m[2][1] * m[3][3] - m[3][1] * m[2][3]
+    c3 = m[2][1] * m[3][2] - m[3][1] * m[2][2]
+    c2 = m[2][0] * m[3][3] - m[3][0] * m[2][3]
+    c1 = m[2][0] * m[3][2] - m[3][0] * m[2][2]
+    c0 = m[2][0] * m[3][1] - m[3][0] * m[2][1]
+    return s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+
+
+def inverse_4x4(m: List[List[float]]) -> List[List[float]]:
+    (a00, a01, a02, a03), (a10, a11, a12, a13) = m[0], m[1]
+    (a20, a21, a22, a23), (a30, a31, a32, a33) = m[2], m[3]
+    s0 = a00 * a11 - a10 * a01
+    s1 = a00 * a12 - a10 * a02
+    s2 = a00 * a13 - a10 * a03
+    s3 = a01 * a12 - a11 * a02
+    s4 = a01 * a13 - a11 * a03
+    s5 = a02 * a13 - a12 * a03
+    c5 = a22 * a33 - a32 * a23
+    c4 = a21 * a33 - a31 * a23
+    c3 = a21 * a32 - a31 * a22
+    c2 = a20 * a33 - a30 * a23
+    c1 = a20 * a32 - a30 * a22
+    c0 = a20 * a31 - a30 * a21
+    determinant = s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+    if determinant == 0:
+        raise ValueError("Matrix is not invertible!")
+    d = 1 / determinant
+    return [
+        [
+            (a11 * c5 - a12 * c4 + a13 * c3) * d,
+            (-a01 * c5 + a02 * c4 - a03 * c3) * d,
+            (a31 * s5 - a32 * s4 + a33 * s3) * d,
+            (-a21 * s5 + a22 * s4 - a23 * s3) * d,
+        ],
+        [
+            (-a10 * c5 + a12 * c2 - a13 * c1) * d,
+            (a00 * c5 - a02 * c2 + a03 * c1) * d,
+            (-a30 * s5 + a32 * s2 - a33 * s1) * d,
+            (a20 * s5 - a22 * s2 + a23 * s1) * d,
+        ],
+        [
+            (a10 * c4 - a11 * c2 + a13 * c0) * d,
+            (-a00 * c4 + a01 * c2 - a03 * c0) * d,
+            (a30 * s4 - a31 * s2 + a33 * s0) * d,
+            (-a20 * s4 + a21 * s2 - a23 * s0) * d,
+        ],
+        [
+            (-a10 * c3 + a11 * c1 - a12 * c0) * d,
+            (a00 * c3 - a01 * c1 + a02 * c0) * d,
+            (-a30 * s3 + a31 * s1 - a32 * s0) * d,
+            (a20 * s3 - a21 * s1 + a22 * s0) * d,
+        ],
+    ]
+
+
+def affine_inverse_4x4(m: List[List[float]]) -> List[List[float]]:
+    # [A t; 0 1]^-1 = [A^-1 -A^-1 t; 0 1], with A^-1 from 3x3 cofactors
+    (a, b, c, tx), (d, e, f, ty), (g, h, i, tz) = m[0], m[1], m[2]
+    ca = e * i - f * h
+    cb = f * g - d * i
+    cc = d * h - e * g
+    determinant = a * ca + b * cb + c * cc
+    if determinant == 0:
+        raise ValueError("Matrix is not invertible!")
+    k = 1 / determinant
+    r0 = [ca * k, (c * h - b * i) * k, (b * f - c * e) * k]
+    r1 = [cb * k, (a * i - c * g) * k, (c * d - a * f) * k]
+    r2 = [cc * k, (b * g - a * h) * k, (a * e - b * d) * k]
+    return [
+        r0 + [-(r0[0] * tx + r0[1] * ty + r0[2] * tz)],
+        r1 + [-(r1[0] * tx + r1[1] * ty + r1[2] * tz)],
+        r2 + [-(r2[0] * tx + r2[1] * ty + r2[2] * tz)],
+        [0.0, 0.0, 0.0, 1.0],
+    ]
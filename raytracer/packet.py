@@ -0,0 +1,124 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from raytracer.shape import Shape
+
+# packets are PACKET_SIZE x PACKET_SIZE neighbouring rays
+PACKET_SIZE = 8
+
+# a batch of rays laid out as height x width, split into packets of
+# rows x columns: (height, width, rows, columns)
+Grid = Tuple[int, int, int, int]
+
+
+def reduce_blocks(ufunc: np.ufunc, values: np.ndarray, size: int) -> np.ndarray:
+    # ufunc reduction over consecutive blocks of `size` entries along the
+    # first axis; reshaping keeps the work in numpy's fast contiguous loops,
+    # which reduceat along a leading axis does not use
+    n = len(values)
+    full = n - n % size
+    shape = (full // size, size) + values.shape[1:]
+    reduced = ufunc.reduce(values[:full].reshape(shape), axis=1)
+    if full < n:
+        rest = ufunc.reduce(values[full:], axis=0, keepdims=True)
+        reduced = np.concatenate([reduced, rest])
+    return reduced
+
+
+def block_bounds(
+    values: np.ndarray, rows: int, columns: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # per-block minimum and maximum of an (h, w, 3) array split into blocks
+    # of rows x columns, as row-major (blocks, 3) float64 arrays
+    bounds = []
+    for ufunc in (np.minimum, np.maximum):
+        reduced = reduce_blocks(ufunc, values, rows).swapaxes(0, 1)
+        reduced = reduce_blocks(ufunc, np.ascontiguousarray(reduced), columns)
+        reduced = reduced.swapaxes(0, 1)
+        bounds.append(reduced.reshape(-1, 3).astype(np.float64))
+    return bounds[0], bounds[1]
+
+
+class Packets:
+    # A batch of rays laid out as a height x width grid (row-major, as
+    # Camera.rays_for_grid returns them) split into packets of rows x columns
+    # neighbouring rays. Each packet is bounded by a cone: its rays start
+    # within `spread` of `apex` and point at most `half_angle` away from
+    # `axis`, so a shape whose bounding sphere lies outside the cone cannot
+    # be hit by any of them. The cone is derived from the box around the
+    # packet's directions, which takes a few reductions over the grid instead
+    # of any per-ray arithmetic. Camera rays share one origin, so the origins
+    # are bounded once for the whole batch.
+    def __init__(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        height: int,
+        width: int,
+        rows: int = PACKET_SIZE,
+        columns: int = PACKET_SIZE,
+    ):
+        self.height, self.width = height, width
+        self.row_sizes = np.minimum(rows, height - np.arange(0, height, rows))
+        self.column_sizes = np.minimum(columns, width - np.arange(0, width, columns))
+        # reduced a row of the grid at a time: numpy's reductions over a
+        # long axis of (n, 3) arrays are several times slower
+        grid = origins.reshape(height, width * 3)
+        low = grid.min(axis=0).reshape(width, 3).min(axis=0).astype(np.float64)
+        high = grid.max(axis=0).reshape(width, 3).max(axis=0).astype(np.float64)
+        self.apex = (low + high) / 2
+        self.spread = float(np.linalg.norm(high - low)) / 2
+
+        low, high = block_bounds(directions.reshape(height, width, 3), rows, columns)
+        # every direction lies in the ball around the box's center through
+        # its corners, and so within asin(radius / |center|) of the center;
+        # a ball around the zero vector bounds no cone at all
+        center = (low + high) / 2
+        length = np.linalg.norm(center, axis=1)
+        radius = np.linalg.norm(high - low, axis=1) / 2
+        self.axis = center / np.where(length > 0, length, 1)[:, None]
+        self.half_angle = np.where(
+            radius < length,
+            np.arcsin(np.minimum(radius / np.where(length > 0, length, 1), 1)),
+            np.pi,
+        )
+
+    def __len__(self) -> int:
+        return len(self.axis)
+
+    def visible(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        # (packets, spheres) mask of the spheres each packet may hit
+        to_center = centers - self.apex
+        distance = np.linalg.norm(to_center, axis=1)
+        reach = radii + self.spread
+        inside = distance <= reach
+        safe = np.where(inside, 1, distance)
+        along = (self.axis @ to_center.T) / safe
+        # angle to the sphere's center against the cone's half-angle plus
+        # the angle the sphere itself subtends
+        angle = np.arccos(np.clip(along, -1, 1))
+        subtended = np.arcsin(np.clip(reach / safe, 0, 1))
+        return inside | (angle <= self.half_angle[:, None] + subtended)
+
+    def rays(self, packets: np.ndarray) -> np.ndarray:
+        # boolean mask over the rays of the selected packets (a boolean mask
+        # over packets)
+        grid = packets.reshape(len(self.row_sizes), len(self.column_sizes))
+        grid = np.repeat(np.repeat(grid, self.row_sizes, 0), self.column_sizes, 1)
+        return grid.reshape(-1)
+
+
+def world_spheres(shapes: Sequence[Shape]) -> Tuple[np.ndarray, np.ndarray]:
+    # world-space centers and radii of spheres enclosing every shape: each
+    # object-space bounding sphere moved by the shape's transform and grown
+    # by the most the transform stretches any direction
+    if not shapes:
+        return np.zeros((0, 3)), np.zeros(0)
+    local = [shape.bounding_sphere() for shape in shapes]
+    centers = np.array([center for center, _ in local], dtype=np.float64)
+    radii = np.array([radius for _, radius in local], dtype=np.float64)
+    transforms = np.array([s.transform.grid for s in shapes], dtype=np.float64)
+    linear = transforms[:, :3, :3]
+    centers = np.einsum("nij,nj->ni", linear, centers) + transforms[:, :3, 3]
+    return centers, radii * np.linalg.norm(linear, ord=2, axis=(1, 2))
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Union
+
+import numpy as np
+
+from raytracer.tuple import EPSILON
+
+Precision = Union[None, str, type, np.dtype]
+
+DTYPES: Dict[str, np.dtype] = {
+    "float32": np.dtype(np.float32),
+    "float64": np.dtype(np.float64),
+}
+# surface offsets for shadow rays and the like; float32 carries about seven
+# significant digits, so EPSILON would drown in rounding error a few units
+# away from the origin
+EPSILONS = {DTYPES["float32"]: 1e-3, DTYPES["float64"]: EPSILON}
+
+# precision used by the array code paths and new canvases unless one is
+# passed explicitly
+default: np.dtype = DTYPES["float64"]
+
+
+def resolve(precision: Precision = None) -> np.dtype:
+    # "float32", np.float32 or np.dtype("float32") alike; None for default
+    dtype = default if precision is None else np.dtype(precision)
+    if dtype not in EPSILONS:
+        raise ValueError(f"Unsupported precision: {precision}")
+    return dtype
+
+
+def epsilon(dtype: Precision = None) -> float:
+    return EPSILONS[resolve(dtype)]
+
+
+def as_float(array) -> np.ndarray:
+    # keeps float32 and float64 arrays as they are and converts anything
+    # else to float64, so batched math runs at the precision it is fed
+    array = np.asarray(array)
+    return array if array.dtype in EPSILONS else array.astype(np.float64)
+
+
+def set_precision(precision: Precision):
+    global default
+    default = resolve(precision)
+
+
+@contextmanager
+def using(precision: Precision) -> Iterator[np.dtype]:
+    global default
+    previous = default
+    default = resolve(precision)
+    try:
+        yield default
+    finally:
+        default = previous
@@ -1,9 +1,11 @@
 from raytracer.matrix import Matrix
 from raytracer.transformation_matrix import scaling_matrix, translation_matrix
-from raytracer.tuple import Point, Tuple, Vector
+from raytracer.tuple import Point, Tuple, Vector, _make
 
 
 class Ray:
+    __slots__ = ("origin", "direction")
+
     def __init__(self, origin: Point, direction: Vector):
         self.origin = origin
         self.direction = direction
@@ -37,3 +39,25 @@ class Ray:
         else:
             raise TypeError("Unexpected type after matrix transformation")
         return self
+
+    def transformed(self, matrix: Matrix) -> "Ray":
+        # returns a new ray; the w row is ignored, as in transform()
+        m00, m01, m02, m03, m10, m11, m12, m13, m20, m21, m22, m23 = matrix.affine()
+        ox, oy, oz = self.origin.x, self.origin.y, self.origin.z
+        dx, dy, dz = self.direction.x, self.direction.y, self.direction.z
+        return Ray(
+            _make(
+                Point,
+                m00 * ox + m01 * oy + m02 * oz + m03,
+                m10 * ox + m11 * oy + m12 * oz + m13,
+                m20 * ox + m21 * oy + m22 * oz + m23,
+                1.0,
+            ),
+            _make(
+                Vector,
+                m00 * dx + m01 * dy + m02 * dz,
+                m10 * dx + m11 * dy + m12 * dz,
+                m20 * dx + m21 * dy + m22 * dz,
+                0.0,
+            ),
+        )
@@ -1,53 +1,72 @@
-from math import pi
+import argparse
+from contextlib import nullcontext
+from math import atan
+from raytracer import stats
+from raytracer.camera import Camera
 from raytracer.canvas import Canvas
-from raytracer.intersection import hit
 from raytracer.light import Light
 from raytracer.material import Material
-from raytracer.ray import Ray
+from raytracer.render import render, render_antialiased
 from raytracer.sphere import Sphere
-from raytracer.transformation import rotation_y
-from raytracer.tuple import Color, Point, Tuple, point
-
+from raytracer.transformation import view_transform
+from raytracer.tuple import Color, Point, Vector
+from raytracer.world import World
 
 if __name__ == "__main__":
-    # start the ray at z = -5
-    ray_origin = Point(0, 0, -5)
-    # put the wall at z = 10
+    parser = argparse.ArgumentParser(description="Render a shaded sphere.")
+    parser.add_argument("--format", choices=["ppm", "p6", "png"], default="ppm")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--antialias",
+        type=int,
+        default=0,
+        metavar="MAX_SAMPLES",
+        help="adaptively supersample edges with up to this many rays per pixel "
+        "(single process, so not with --workers)",
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="print render statistics as JSON"
+    )
+    args = parser.parse_args()
+    if args.antialias and args.workers > 1:
+        # render_antialiased has no tiled multiprocess path
+        parser.error("--antialias renders in a single process; drop --workers")
+
+    # look from z = -5 at a 7x7 wall placed at z = 10
     wall_z = 10
     wall_size = 7.0
     canvas_pixels = 512
-    pixel_size = wall_size / canvas_pixels
-    half = wall_size / 2
+    camera = Camera(
+        canvas_pixels, canvas_pixels, 2 * atan(wall_size / 2 / (wall_z + 5))
+    )
+    camera.transform = view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
     canvas = Canvas(canvas_pixels, canvas_pixels)
-    color = Color(1, 0, 0)  # red
 
     shape = Sphere()
     shape.material = Material()
     shape.material.color = Color(1, 0.2, 1)
 
-    light_position = Point(-10, 10, -10)
-    light_color = Color(1, 1, 1)
-    light = Light(light_position, light_color)
+    world = World()
+    world.objects.append(shape)
+    world.light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+
+    with stats.collect() if args.stats else nullcontext() as collector:
+        if args.antialias:
+            spp = render_antialiased(
+                world,
+                camera,
+                canvas,
+                min(4, args.antialias),
+                args.antialias,
+                batch=True,
+            )
+            print(f"{spp:.2f} samples per pixel")
+        else:
+            render(world, camera, canvas, workers=args.workers, batch=True)
 
-    # for each row of pixels in the canvas
-    for y in range(canvas_pixels):
-        # compute the world y coordinate (top = +half, bottom = -half)
-        world_y = half - pixel_size * y
-        # for each pixel in the row
-        for x in range(canvas_pixels):
-            # compute the world x coordinate (left = -half, right = half)
-            world_x = -half + pixel_size * x
-            # describe the point on the wall that the ray will target
-            position = Point(world_x, world_y, wall_z)
-            r = Ray(ray_origin, (position - ray_origin).normalize())  # type: ignore
-            xs = shape.intersect(r)
-            _hit = hit(xs)
-            if _hit:
-                point = r.position(_hit.t)
-                normal = _hit.object.normal_at(point)
-                eye = -r.direction
-                color = _hit.object.material.lighting(light, point, eye, normal)
-                canvas.write_pixel(x, y, color)
+        filename = "sphere.png" if args.format == "png" else "sphere.ppm"
+        with open(filename, "wb") as f:
+            getattr(canvas, f"write_{args.format}")(f)
 
-    with open("sphere.ppm", "w") as f:
-        f.write(canvas.to_ppm())
+    if collector is not None:
+        print(collector.to_json(indent=2))
@@ -0,0 +1,348 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from raytracer import stats
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas, MemmapCanvas
+from raytracer.packet import PACKET_SIZE, Grid, Packets
+from raytracer.precision import Precision, resolve
+from raytracer.ray import Ray
+from raytracer.tuple import Point, Vector
+from raytracer.world import World
+
+Tile = Tuple[int, int, int, int]
+# (step, y0, y1): rows y0 <= y < y1 are complete at a spacing of `step` pixels
+Band = Tuple[int, int, int]
+
+
+def tiles(width: int, height: int, size: int) -> Iterator[Tile]:
+    for y in range(0, height, size):
+        for x in range(0, width, size):
+            yield x, y, min(x + size, width), min(y + size, height)
+
+
+def shade(
+    world: World,
+    origins: np.ndarray,
+    directions: np.ndarray,
+    batch: bool = False,
+    grid: Optional[Grid] = None,
+) -> np.ndarray:
+    # With statistics on, every ray is intersected before any hit is shaded
+    # so that the two phases can be timed per tile rather than per ray. With
+    # a `grid` the batch path traces the rays as packets, culling whole
+    # packets against each object's bounds first.
+    collector = stats.current
+    if batch:
+        with stats.phase("intersection"):
+            packets = None
+            if grid is not None and len(origins):
+                packets = Packets(origins, directions, *grid)
+                stats.count("packets", len(packets))
+            nearest, owner = world.intersect_batch(origins, directions, packets)
+        with stats.phase("shading"):
+            block = world.shade_batch(origins, directions, nearest, owner)
+        if collector is not None:
+            hits = int(np.count_nonzero(owner >= 0))
+    elif collector is None:
+        block = np.empty((len(origins), 3))
+        pairs = zip(origins.tolist(), directions.tolist())
+        for i, (origin, direction) in enumerate(pairs):
+            color = world.color_at(Ray(Point(*origin), Vector(*direction)))
+            block[i] = (color.red, color.green, color.blue)
+        return block
+    else:
+        bvh = world.bvh
+        tests = bvh.tests
+        with stats.phase("intersection"):
+            rays = [
+                Ray(Point(*origin), Vector(*direction))
+                for origin, direction in zip(origins.tolist(), directions.tolist())
+            ]
+            found = [world.nearest_hit(ray) for ray in rays]
+        primary_tests = bvh.tests
+        with stats.phase("shading"):
+            block = np.zeros((len(rays), 3))
+            for i, (ray, _hit) in enumerate(zip(rays, found)):
+                if _hit is not None:
+                    color = world.shade_hit(ray, _hit)
+                    block[i] = (color.red, color.green, color.blue)
+        hits = len(found) - found.count(None)
+        collector.count("intersection_tests", primary_tests - tests)
+        collector.count("shadow_tests", bvh.tests - primary_tests)
+    if collector is not None:
+        # one lighting call and one shadow ray per shaded point and light
+        collector.count("lighting_calls", hits * len(world.lights))
+        collector.count("shadow_rays", hits * len(world.lights))
+        collector.count("rays", len(origins))
+        collector.count("hits", hits)
+        collector.count("misses", len(origins) - hits)
+    return block
+
+
+def render_tile(
+    world: World,
+    camera: Camera,
+    pixels: np.ndarray,
+    tile: Tile,
+    batch: bool = False,
+    precision: Precision = None,
+):
+    x0, y0, x1, y1 = tile
+    with stats.phase("ray_generation"):
+        origins, directions = camera.rays_for_rows(y0, y1, x0, x1, precision)
+    grid = (y1 - y0, x1 - x0, PACKET_SIZE, PACKET_SIZE)
+    block = shade(world, origins, directions, batch, grid)
+    pixels[y0:y1, x0:x1] = block.reshape(y1 - y0, x1 - x0, 3)
+
+
+def render_grid(
+    world: World,
+    camera: Camera,
+    pixels: np.ndarray,
+    xs: np.ndarray,
+    ys: np.ndarray,
+    batch: bool = False,
+    precision: Precision = None,
+):
+    if len(xs) and len(ys):
+        with stats.phase("ray_generation"):
+            origins, directions = camera.rays_for_grid(xs, ys, precision)
+        grid = (len(ys), len(xs), PACKET_SIZE, PACKET_SIZE)
+        block = shade(world, origins, directions, batch, grid)
+        pixels[np.ix_(ys, xs)] = block.reshape(len(ys), len(xs), 3)
+
+
+# per-process state, set up once by the pool initializer so that tasks only
+# carry tile coordinates and results land directly in shared memory
+_worker_state: Tuple[World, Camera, np.ndarray, bool, np.dtype, Optional[SharedMemory]]
+
+
+def _init_worker(
+    world: World,
+    camera: Camera,
+    batch: bool,
+    precision: np.dtype,
+    name: Optional[str],
+    shape: tuple,
+    dtype,
+    collect: bool = False,
+    path: Optional[str] = None,
+):
+    # the framebuffer is either the shared memory block `name` or, for a
+    # MemmapCanvas, the .npy file at `path`
+    global _worker_state
+    shm: Optional[SharedMemory] = None
+    if path is not None:
+        pixels = np.load(path, mmap_mode="r+")
+    else:
+        shm = SharedMemory(name=name)
+        pixels = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker_state = (world, camera, pixels, batch, precision, shm)
+    stats.current = stats.RenderStats() if collect else None
+
+
+def _render_tile_in_worker(tile: Tile) -> Optional[Dict[str, Any]]:
+    world, camera, pixels, batch, precision, _ = _worker_state
+    render_tile(world, camera, pixels, tile, batch, precision)
+    # hand this tile's statistics back to the parent and start afresh
+    collector = stats.current
+    if collector is None:
+        return None
+    stats.current = stats.RenderStats()
+    return collector.as_dict()
+
+
+def _render_in_pool(
+    workers: int, jobs: List[Tile], initargs: tuple, path: Optional[str] = None
+):
+    collector = stats.current
+    initargs += (collector is not None, path)
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=initargs
+    ) as pool:
+        for result in pool.map(_render_tile_in_worker, jobs):
+            if collector is not None and result is not None:
+                collector.merge(result)
+
+
+def render(
+    world: World,
+    camera: Camera,
+    canvas: Canvas,
+    workers: int = 1,
+    tile: int = 64,
+    batch: bool = False,
+    precision: Precision = None,
+) -> Canvas:
+    # `precision` (default: raytracer.precision.default) applies to the
+    # batched array math; the scalar path always uses Python floats
+    if (canvas.width, canvas.height) != (camera.hsize, camera.vsize):
+        raise ValueError("Canvas size does not match camera!")
+
+    precision = resolve(precision)
+    jobs = list(tiles(canvas.width, canvas.height, tile))
+    if workers <= 1:
+        for job in jobs:
+            render_tile(world, camera, canvas.pixels, job, batch, precision)
+        return canvas
+
+    shape, dtype = canvas.pixels.shape, canvas.pixels.dtype
+    if isinstance(canvas, MemmapCanvas) and canvas.writable:
+        # workers map the canvas file themselves and write tiles in place;
+        # their shared mappings land in the same page cache as the canvas's,
+        # so one flush once the pool has joined writes every tile to disk
+        canvas.flush()
+        initargs = (world, camera, batch, precision, None, shape, dtype)
+        _render_in_pool(workers, jobs, initargs, canvas.path)
+        canvas.flush()
+        return canvas
+
+    shm = SharedMemory(create=True, size=canvas.pixels.nbytes)
+    try:
+        pixels = np.ndarray(shape, dtype, buffer=shm.buf)
+        _render_in_pool(
+            workers, jobs, (world, camera, batch, precision, shm.name, shape, dtype)
+        )
+        canvas.pixels[:] = pixels
+        del pixels
+    finally:
+        shm.close()
+        shm.unlink()
+    return canvas
+
+
+def render_progressive(
+    world: World,
+    camera: Camera,
+    canvas: Canvas,
+    step: int = 8,
+    band: int = 0,
+    batch: bool = False,
+    precision: Precision = None,
+) -> Iterator[Band]:
+    # Renders every `step`-th pixel first, then halves the spacing until every
+    # pixel is traced, never tracing a pixel twice. Pixels not traced yet are
+    # filled from the nearest traced one up and to the left, so the canvas is a
+    # usable preview whenever control returns to the caller, who may stop
+    # iterating at any point (e.g. on a time budget). Each pass is split into
+    # bands of `band` rows (default: the whole canvas).
+    if (canvas.width, canvas.height) != (camera.hsize, camera.vsize):
+        raise ValueError("Canvas size does not match camera!")
+    if step < 1 or step & (step - 1):
+        raise ValueError("Progressive step must be a power of two!")
+
+    precision = resolve(precision)
+    first = step
+    # bands start on multiples of the coarsest step so that every band owns
+    # the samples its pixels are filled from
+    band = -(-(band or canvas.height) // first) * first
+    pixels = canvas.pixels
+    while step >= 1:
+        xs = np.arange(0, canvas.width, step)
+        for y0 in range(0, canvas.height, band):
+            y1 = min(y0 + band, canvas.height)
+            ys = np.arange(y0, y1, step)
+            if step == first:
+                render_grid(world, camera, pixels, xs, ys, batch, precision)
+            else:
+                # rows and columns at twice the spacing are already traced
+                render_grid(world, camera, pixels, xs, ys[1::2], batch, precision)
+                render_grid(world, camera, pixels, xs[1::2], ys[::2], batch, precision)
+            if step > 1:
+                rows = np.arange(y0, y1) // step * step
+                columns = np.arange(canvas.width) // step * step
+                pixels[y0:y1] = pixels[np.ix_(rows, columns)]
+            yield step, y0, y1
+        step //= 2
+
+
+def halton(index: np.ndarray, base: int) -> np.ndarray:
+    # radical inverse of index in the given base, in [0, 1)
+    result = np.zeros(len(index))
+    fraction = 1.0
+    index = np.array(index)
+    while index.any():
+        fraction /= base
+        result += fraction * (index % base)
+        index //= base
+    return result
+
+
+def sample_offsets(n: int) -> np.ndarray:
+    # (n, 2) sub-pixel offsets from a 2-D Halton sequence; any prefix is
+    # well spread over the pixel, so samples can be added a few at a time
+    index = np.arange(1, n + 1)
+    return np.stack([halton(index, 2), halton(index, 3)], axis=1)
+
+
+def render_antialiased(
+    world: World,
+    camera: Camera,
+    canvas: Canvas,
+    samples: int = 4,
+    max_samples: int = 16,
+    threshold: float = 0.05,
+    batch: bool = False,
+    chunk: int = 1 << 16,
+    precision: Precision = None,
+) -> float:
+    # Traces `samples` rays per pixel, then keeps adding `samples` more to
+    # pixels whose samples spread by more than `threshold` (standard
+    # deviation of any channel) or whose color differs from a neighbour's by
+    # more than `threshold`, until they settle or reach `max_samples`.
+    # Returns the average number of samples per pixel.
+    if (canvas.width, canvas.height) != (camera.hsize, camera.vsize):
+        raise ValueError("Canvas size does not match camera!")
+    if not 1 <= samples <= max_samples:
+        raise ValueError("Need 1 <= samples <= max_samples!")
+
+    precision = resolve(precision)
+    width, height = canvas.width, canvas.height
+    offsets = sample_offsets(max_samples)
+    total = np.zeros((width * height, 3))
+    squares = np.zeros((width * height, 3))
+    counts = np.zeros(width * height, dtype=np.int64)
+    active = np.arange(width * height)
+    while len(active):
+        first = counts[active[0]]
+        n = min(samples, max_samples - first)
+        dx, dy = offsets[first : first + n].T
+        per_chunk = max(1, chunk // n)
+        for start in range(0, len(active), per_chunk):
+            pixels = active[start : start + per_chunk]
+            xs = (pixels % width)[:, None] + dx
+            ys = (pixels // width)[:, None] + dy
+            with stats.phase("ray_generation"):
+                origins, directions = camera.rays_for_points(
+                    xs.ravel(), ys.ravel(), precision
+                )
+            # a packet is the samples of consecutive active pixels, mostly
+            # neighbours on the same row
+            grid = (len(pixels), n, max(1, PACKET_SIZE ** 2 // n), n)
+            colors = shade(world, origins, directions, batch, grid)
+            colors = colors.reshape(-1, n, 3)
+            total[pixels] += colors.sum(axis=1)
+            squares[pixels] += (colors * colors).sum(axis=1)
+        counts[active] += n
+        if first + n >= max_samples:
+            break
+
+        mean = total / counts[:, None]
+        variance = squares[active] / counts[active, None] - mean[active] ** 2
+        noisy = variance.max(axis=1) > threshold * threshold
+        image = mean.reshape(height, width, 3)
+        edges = np.zeros((height, width), dtype=bool)
+        across = np.abs(np.diff(image, axis=1)).max(axis=2) > threshold
+        down = np.abs(np.diff(image, axis=0)).max(axis=2) > threshold
+        edges[:, 1:] |= across
+        edges[:, :-1] |= across
+        edges[1:] |= down
+        edges[:-1] |= down
+        active = active[noisy | edges.reshape(-1)[active]]
+
+    canvas.pixels[:] = (total / counts[:, None]).reshape(height, width, 3)
+    return float(counts.mean())
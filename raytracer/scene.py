@@ -0,0 +1,146 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas
+from raytracer.light import Light
+from raytracer.material import Material
+from raytracer.render import render
+from raytracer.shape import Shape
+from raytracer.sphere import Sphere
+from raytracer.transformation import Transform, view_transform
+from raytracer.tuple import Color, Point, Vector
+from raytracer.world import World
+
+SHAPES = {"sphere": Sphere}
+# the batched path intersects and shadow-tests every ray against every
+# object; past this many objects the BVH-accelerated per-ray path wins
+BATCH_MAX_OBJECTS = 16
+MATERIAL_FIELDS = ("ambient", "diffuse", "specular", "shininess")
+# transformation name -> number of arguments, applied with Transform's
+# fluent methods in the order listed
+OPERATIONS = {
+    "translate": 3,
+    "scale": 3,
+    "rotate_x": 1,
+    "rotate_y": 1,
+    "rotate_z": 1,
+    "shear": 6,
+}
+
+
+def load_transform(operations: List[List[Any]]) -> Transform:
+    transform = Transform()
+    for operation in operations:
+        name, *args = operation
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown transformation: {name}")
+        if len(args) != OPERATIONS[name]:
+            raise ValueError(f"{name} takes {OPERATIONS[name]} arguments")
+        getattr(transform, name)(*map(float, args))
+    return transform
+
+
+def load_material(description: Dict[str, Any]) -> Material:
+    material = Material()
+    for name, value in description.items():
+        if name == "color":
+            material.color = Color(*value)
+        elif name in MATERIAL_FIELDS:
+            setattr(material, name, float(value))
+        else:
+            raise ValueError(f"Unknown material field: {name}")
+    return material
+
+
+def load_shape(description: Dict[str, Any]) -> Shape:
+    kind = description.get("type", "sphere")
+    if kind not in SHAPES:
+        raise ValueError(f"Unknown shape type: {kind}")
+    shape = SHAPES[kind]()
+    shape.transform = load_transform(description.get("transform", []))
+    shape.material = load_material(description.get("material", {}))
+    return shape
+
+
+def load_camera(description: Dict[str, Any]) -> Camera:
+    camera = Camera(
+        int(description.get("width", 100)),
+        int(description.get("height", 100)),
+        float(description["field_of_view"]),
+    )
+    camera.transform = view_transform(
+        Point(*description.get("from", (0, 0, -5))),
+        Point(*description.get("to", (0, 0, 0))),
+        Vector(*description.get("up", (0, 1, 0))),
+    )
+    return camera
+
+
+class Scene:
+    # A world and camera loaded once and compiled for repeated rendering:
+    # shape and camera inverses are computed as they are loaded, the
+    # structure the default rendering path culls with (the packet bounding
+    # spheres or the BVH) is built up front, and cameras for other
+    # resolutions are derived once and reused.
+    def __init__(self, world: World, camera: Camera):
+        self.world = world
+        self.camera = camera
+        self.cameras: Dict[Tuple[int, int], Camera] = {
+            (camera.hsize, camera.vsize): camera
+        }
+        if self.batch:
+            world.spheres
+        else:
+            world.bvh
+
+    @property
+    def batch(self) -> bool:
+        # whether rendering should default to the batched array path
+        return len(self.world.objects) <= BATCH_MAX_OBJECTS
+
+    def camera_for(self, width: int, height: int) -> Camera:
+        key = (width, height)
+        if key not in self.cameras:
+            camera = Camera(width, height, self.camera.field_of_view)
+            camera.transform = self.camera.transform
+            self.cameras[key] = camera
+        return self.cameras[key]
+
+    def render(
+        self,
+        size: Optional[Tuple[int, int]] = None,
+        canvas: Optional[Canvas] = None,
+        **options,
+    ) -> Canvas:
+        # size defaults to the canvas's, or failing that the scene camera's
+        if size is None:
+            size = (
+                (canvas.width, canvas.height)
+                if canvas is not None
+                else (self.camera.hsize, self.camera.vsize)
+            )
+        camera = self.camera_for(*size)
+        if canvas is None:
+            canvas = Canvas(*size, dtype=options.get("precision"))
+        return render(self.world, camera, canvas, **options)
+
+
+def load_scene(source: Union[str, Dict[str, Any]]) -> Scene:
+    # source is a parsed description or JSON text:
+    # {"camera": {"width", "height", "field_of_view", "from", "to", "up"},
+    #  "lights": [{"position", "intensity"}],
+    #  "objects": [{"type", "transform": [[name, *args]], "material"}]}
+    description = json.loads(source) if isinstance(source, str) else source
+    world = World()
+    world.objects.extend(load_shape(shape) for shape in description.get("objects", []))
+    world.lights = [
+        Light(Point(*light["position"]), Color(*light.get("intensity", (1, 1, 1))))
+        for light in description.get("lights", [])
+    ]
+    return Scene(world, load_camera(description["camera"]))
+
+
+def load_scene_file(path: str) -> Scene:
+    with open(path) as f:
+        return load_scene(json.load(f))
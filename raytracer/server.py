@@ -0,0 +1,337 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from raytracer.canvas import quantize
+from raytracer.packet import PACKET_SIZE
+from raytracer.precision import Precision, resolve
+from raytracer.render import Tile, shade, tiles
+from raytracer.scene import Scene, load_scene
+
+# Protocol: one JSON object per line in each direction. A request is
+#   {"id": ..., "scene": {...} | "scene_file": path, "size": [w, h],
+#    "tile": 32, "batch": true, "precision": "float64"}
+# where "batch" defaults to the scene's own choice of rendering path and
+# "scene_file" is relative to, and must stay inside, the server's scene
+# directory
+# and is answered by a stream of
+#   {"id": ..., "event": "tile", "tile": [x0, y0, x1, y1], "rgb": base64}
+# lines (8-bit RGB, row-major, in completion order) followed by
+#   {"id": ..., "event": "done", "tiles": n, "seconds": s}
+# or a single {"id": ..., "event": "error", "message": ...}.
+
+DEFAULT_TILE = 32
+SCENE_CACHE_SIZE = 8
+# tiles submitted to the pool per worker process at any one time
+TILES_PER_WORKER = 2
+# replies buffered per connection while the client is reading slowly
+OUTPUT_BUFFER = 256
+
+Write = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# compiled scenes kept by each pool process, least recently used first
+_scenes: "OrderedDict[str, Scene]" = OrderedDict()
+
+
+def scene_digest(description: Dict[str, Any]) -> str:
+    text = json.dumps(description, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SceneNotCached(KeyError):
+    # raised in a pool process asked to render a scene by digest alone
+    # before it has compiled that scene
+    pass
+
+
+def read_scene_file(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compiled_scene(key: str, description: Optional[Dict[str, Any]]) -> Scene:
+    scene = _scenes.get(key)
+    if scene is None:
+        if description is None:
+            raise SceneNotCached(key)
+        scene = _scenes[key] = load_scene(description)
+        if len(_scenes) > SCENE_CACHE_SIZE:
+            _scenes.popitem(last=False)
+    else:
+        _scenes.move_to_end(key)
+    return scene
+
+
+def render_job_tile(
+    key: str,
+    description: Optional[Dict[str, Any]],
+    size: Tuple[int, int],
+    tile: Tile,
+    batch: Optional[bool],
+    precision: Precision = None,
+) -> Tuple[Tile, bytes]:
+    # runs in a pool process; returns the tile as 8-bit RGB bytes. The
+    # description is only sent after the process reported SceneNotCached.
+    scene = compiled_scene(key, description)
+    if batch is None:
+        batch = scene.batch
+    camera = scene.camera_for(*size)
+    x0, y0, x1, y1 = tile
+    origins, directions = camera.rays_for_rows(y0, y1, x0, x1, precision)
+    grid = (y1 - y0, x1 - x0, PACKET_SIZE, PACKET_SIZE)
+    block = shade(scene.world, origins, directions, batch, grid)
+    return tile, quantize(block).tobytes()
+
+
+class JobServer:
+    # Accepts render jobs from any number of connections into one bounded
+    # queue and runs at most `max_jobs` of them at a time on a process pool
+    # that stays warm between jobs. A connection stops being read while the
+    # queue is full. Replies go out through a per-connection buffer of
+    # `output_buffer` lines written by a task of their own, so a job only
+    # waits on its client once that buffer is full; a client that stops
+    # reading for longer than that holds a runner, and with it a share of
+    # the pool, until it reads again or disconnects.
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_jobs: int = 2,
+        queue_size: int = 16,
+        tile: int = DEFAULT_TILE,
+        output_buffer: int = OUTPUT_BUFFER,
+        scene_dir: Optional[str] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_jobs = max_jobs
+        self.tile = tile
+        self.output_buffer = output_buffer
+        # requests may only name scene files in here; None disables them
+        self.scene_dir = scene_dir
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.queue: "asyncio.Queue[Tuple[Dict[str, Any], Write, asyncio.Future]]"
+        self.queue = asyncio.Queue(queue_size)
+        self.runners: List[asyncio.Task] = []
+
+    async def start(self):
+        # start the worker processes now rather than on the first job
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.pool, os.getpid) for _ in range(self.workers))
+        )
+        self.runners = [
+            asyncio.create_task(self.run_jobs()) for _ in range(self.max_jobs)
+        ]
+
+    async def close(self):
+        for runner in self.runners:
+            runner.cancel()
+        await asyncio.gather(*self.runners, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+    async def run_jobs(self):
+        while True:
+            request, write, done = await self.queue.get()
+            job = request.get("id") if isinstance(request, dict) else None
+            try:
+                await self.run(request, write)
+            except Exception as error:
+                # the client may be gone or the reply unwritable, neither of
+                # which may stop this runner
+                with suppress(Exception):
+                    await write({"id": job, "event": "error", "message": str(error)})
+            finally:
+                done.set_result(None)
+                self.queue.task_done()
+
+    async def run(self, request: Dict[str, Any], write: Write):
+        start = time.perf_counter()
+        description: Optional[Dict[str, Any]] = request.get("scene")
+        if description is None:
+            path = self.scene_path(request["scene_file"])
+            loop = asyncio.get_running_loop()
+            description = await loop.run_in_executor(None, read_scene_file, path)
+        key = scene_digest(description)
+        camera = description["camera"]
+        width, height = request.get("size") or (camera["width"], camera["height"])
+        batch = request.get("batch")
+        # resolved here so a bad value fails the job before any tile is queued
+        precision = resolve(request.get("precision")).name
+        loop = asyncio.get_running_loop()
+
+        def submit(tile: Tile, scene: Optional[Dict[str, Any]] = None):
+            future = loop.run_in_executor(
+                self.pool,
+                render_job_tile,
+                key,
+                scene,
+                (width, height),
+                tile,
+                batch,
+                precision,
+            )
+            running[future] = tile
+
+        # tiles go out a few per worker at a time, so a large job neither
+        # floods the pool's queue nor holds up the tiles of other jobs
+        remaining = iter(tiles(width, height, request.get("tile", self.tile)))
+        running: Dict[asyncio.Future, Tile] = {}
+        for tile in islice(remaining, self.workers * TILES_PER_WORKER):
+            submit(tile)
+        count = 0
+        try:
+            while running:
+                finished, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in finished:
+                    tile = running.pop(future)
+                    try:
+                        _, rgb = future.result()
+                    except SceneNotCached:
+                        submit(tile, description)
+                        continue
+                    await write(
+                        {
+                            "id": request.get("id"),
+                            "event": "tile",
+                            "tile": list(tile),
+                            "rgb": base64.b64encode(rgb).decode("ascii"),
+                        }
+                    )
+                    count += 1
+                    following = next(remaining, None)
+                    if following is not None:
+                        submit(following)
+        finally:
+            for future in running:
+                future.cancel()
+        seconds = time.perf_counter() - start
+        await write(
+            {
+                "id": request.get("id"),
+                "event": "done",
+                "tiles": count,
+                "seconds": seconds,
+            }
+        )
+
+    def scene_path(self, name: str) -> str:
+        if self.scene_dir is None:
+            raise ValueError("this server does not read scene files")
+        root = os.path.realpath(self.scene_dir)
+        path = os.path.realpath(os.path.join(root, name))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"scene file {name!r} is outside the scene directory")
+        return path
+
+    async def handle(self, reader: asyncio.StreamReader, writer: Any):
+        # one JSON-lines session; returns once every job read from it is done
+        # and every reply has been written
+        output: "asyncio.Queue[Optional[Dict[str, Any]]]"
+        output = asyncio.Queue(self.output_buffer)
+        # set once the client is gone (replies still buffered are dropped)
+        # or the session is over; later writes fail the job writing
+        lost: List[ConnectionError] = []
+        closed: List[ConnectionError] = []
+
+        async def send():
+            while True:
+                message = await output.get()
+                if message is None:
+                    return
+                if lost:
+                    continue
+                try:
+                    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+                    await writer.drain()
+                except ConnectionError as error:
+                    lost.append(error)
+
+        async def write(message: Dict[str, Any]):
+            if lost or closed:
+                raise (lost + closed)[0]
+            await output.put(message)
+
+        sender = asyncio.create_task(send())
+        try:
+            await self.read_jobs(reader, write)
+        finally:
+            # jobs still running after a failed read must not fill the
+            # buffer once nothing drains it
+            closed.append(ConnectionResetError("connection closed"))
+            await output.put(None)
+            await sender
+
+    async def read_jobs(self, reader: asyncio.StreamReader, write: Write):
+        loop = asyncio.get_running_loop()
+        pending: List[asyncio.Future] = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                await write({"id": None, "event": "error", "message": str(error)})
+                continue
+            if not isinstance(request, dict):
+                message = "request must be a JSON object"
+                await write({"id": None, "event": "error", "message": message})
+                continue
+            done = loop.create_future()
+            await self.queue.put((request, write, done))
+            pending.append(done)
+        await asyncio.gather(*pending)
+
+
+async def serve_socket(server: JobServer, path: str):
+    unix_server = await asyncio.start_unix_server(server.handle, path)
+    async with unix_server:
+        await unix_server.serve_forever()
+
+
+async def serve_stdio(server: JobServer):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+    transport, protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, sys.stdout
+    )
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    await server.handle(reader, writer)
+
+
+async def serve(
+    socket_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    max_jobs: int = 2,
+    queue_size: int = 16,
+    scene_dir: Optional[str] = None,
+):
+    # scene files are read from the working directory on stdio, whose
+    # client already has the server's access, but only from an explicit
+    # scene_dir on a socket
+    if scene_dir is None and socket_path is None:
+        scene_dir = os.getcwd()
+    server = JobServer(workers, max_jobs, queue_size, scene_dir=scene_dir)
+    await server.start()
+    try:
+        if socket_path is None:
+            await serve_stdio(server)
+        else:
+            await serve_socket(server, socket_path)
+    finally:
+        await server.close()
@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Union
+
+import numpy as np
+
+from raytracer.bounds import Bounds
+from raytracer.intersection import Intersection
+from raytracer.material import Material
+from raytracer.matrix import Matrix
+from raytracer.ray import Ray
+from raytracer.transformation import Transform, matrix_and_inverse
+from raytracer.tuple import Point, Tuple
+
+
+class Shape(ABC):
+    # bumped on every transform assignment to any shape, so that worlds can
+    # tell cheaply when none of their shapes can have changed
+    transform_changes: int = 0
+
+    def __init__(self):
+        # transform assignments to this shape, for telling when bounds built
+        # over it went stale
+        self.version = 0
+        self.material = Material()
+        self.transform = Matrix.identity()
+
+    @property
+    def transform(self) -> Matrix:
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform: Union[Matrix, Transform]):
+        # invert once per assignment instead of once per ray
+        self._transform, self.inverse = matrix_and_inverse(transform)
+        self.inverse_transpose = self.inverse.transpose()
+        self.inverse_array = np.array(self.inverse.grid, dtype=np.float64)
+        self.version += 1
+        Shape.transform_changes += 1
+
+    @abstractmethod
+    def bounds(self) -> Bounds:
+        raise NotImplementedError
+
+    def bounding_sphere(self) -> tuple[np.ndarray, float]:
+        # object-space center and radius of a sphere enclosing bounds()
+        box = self.bounds()
+        if not (np.isfinite(box.minimum).all() and np.isfinite(box.maximum).all()):
+            return np.zeros(3), float("inf")
+        return box.centroid(), float(np.linalg.norm(box.maximum - box.minimum)) / 2
+
+    def world_bounds(self) -> Bounds:
+        return self.bounds().transform(self.transform)
+
+    @abstractmethod
+    def intersect(self, ray: Ray) -> List[Intersection]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def intersect_ts(self, ray: Ray) -> Optional[tuple[float, float]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def normal_at(self, world_point: Point) -> Tuple:
+        raise NotImplementedError
+
+    @abstractmethod
+    def intersect_batch(
+        self, origins: np.ndarray, directions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def normal_at_batch(self, world_points: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
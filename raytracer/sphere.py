@@ -1,35 +1,87 @@
-from typing import List
+from typing import List, Optional
+
+import numpy as np
+
+from raytracer.bounds import Bounds
 from raytracer.intersection import Intersection
-from raytracer.material import Material
-from raytracer.matrix import Matrix
+from raytracer.precision import as_float
 from raytracer.ray import Ray
-from raytracer.transformation_matrix import scaling_matrix
-from raytracer.tuple import Point
+from raytracer.shape import Shape
+from raytracer.tuple import Point, Tuple
 
 
-class Sphere:
+class Sphere(Shape):
     def __init__(self):
+        super().__init__()
         self.origin = Point(0, 0, 0)
         self.radius = 1
-        self.transform = Matrix.identity()
-        self.material = Material()
+
+    def bounds(self) -> Bounds:
+        return Bounds((-1, -1, -1), (1, 1, 1))
+
+    def bounding_sphere(self) -> tuple[np.ndarray, float]:
+        return np.zeros(3), 1.0
 
     def intersect(self, ray: Ray) -> List[Intersection]:
-        ray2 = ray.transform(self.transform.inverse())
+        ts = self.intersect_ts(ray)
+        if ts is None:
+            return []
+        return [Intersection(ts[0], self), Intersection(ts[1], self)]
+
+    def intersect_ts(self, ray: Ray) -> Optional[tuple[float, float]]:
+        ray2 = ray.transformed(self.inverse)
         sphere_to_ray = ray2.origin - self.origin
         a = ray2.direction.dot(ray2.direction)
         b = 2 * ray2.direction.dot(sphere_to_ray)
         c = sphere_to_ray.dot(sphere_to_ray) - 1
         discriminant = b ** 2 - 4 * a * c
         if discriminant < 0:
-            return []
+            return None
         t1 = (-b - discriminant ** 0.5) / (2 * a)
         t2 = (-b + discriminant ** 0.5) / (2 * a)
-        return [Intersection(t1, self), Intersection(t2, self)]
+        return t1, t2
+
+    def intersect_batch(
+        self, origins: np.ndarray, directions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        origins = as_float(origins)
+        directions = as_float(directions)
+        dtype = np.result_type(origins, directions)
+        n = len(origins)
+        # origins as points (w=1) and directions as vectors (w=0), moved into
+        # object space with a single product against the cached inverse
+        rays = np.zeros((2, n, 4), dtype=dtype)
+        rays[0, :, :3] = origins[:, :3]
+        rays[0, :, 3] = 1.0
+        rays[1, :, :3] = directions[:, :3]
+        local = rays @ self.inverse_array.T.astype(dtype)
+        center = np.array([self.origin.x, self.origin.y, self.origin.z], dtype=dtype)
+        sphere_to_ray = local[0, :, :3] - center
+        local_directions = local[1, :, :3]
 
-    def normal_at(self, world_point: Point) -> Point:
-        object_point = self.transform.inverse() * world_point
+        a = np.einsum("ij,ij->i", local_directions, local_directions)
+        b = 2 * np.einsum("ij,ij->i", local_directions, sphere_to_ray)
+        c = np.einsum("ij,ij->i", sphere_to_ray, sphere_to_ray) - 1
+        discriminant = b ** 2 - 4 * a * c
+        mask = discriminant >= 0
+        root = np.sqrt(np.where(mask, discriminant, 0.0))
+        t0 = np.where(mask, (-b - root) / (2 * a), np.inf)
+        t1 = np.where(mask, (-b + root) / (2 * a), np.inf)
+        return t0, t1, mask
+
+    def normal_at(self, world_point: Point) -> Tuple:
+        object_point = self.inverse * world_point
         object_normal = object_point - self.origin
-        world_normal = self.transform.inverse().transpose() * object_normal
+        world_normal = self.inverse_transpose * object_normal
         world_normal.w = 0
         return world_normal.normalize()
+
+    def normal_at_batch(self, world_points: np.ndarray) -> np.ndarray:
+        world_points = as_float(world_points)[:, :3]
+        inverse = self.inverse_array.astype(world_points.dtype)
+        object_points = world_points @ inverse[:3, :3].T + inverse[:3, 3]
+        center = [self.origin.x, self.origin.y, self.origin.z]
+        object_normals = object_points - np.array(center, dtype=world_points.dtype)
+        # the w row of the inverse transpose is dropped, as normal_at zeroes w
+        world_normals = object_normals @ inverse[:3, :3]
+        return world_normals / np.linalg.norm(world_normals, axis=1)[:, None]
@@ -0,0 +1,107 @@
+import json
+import sys
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+from raytracer.matrix import Matrix
+
+
+class Phase:
+    # adds wall time and the net change in allocated blocks (objects still
+    # alive at the end of the phase) to a named phase
+    __slots__ = ("stats", "name", "start", "blocks")
+
+    def __init__(self, stats: "RenderStats", name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = perf_counter() - self.start
+        blocks = sys.getallocatedblocks() - self.blocks
+        self.stats.add_phase(self.name, seconds, blocks)
+
+
+class RenderStats:
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.phases: Dict[str, Dict[str, Any]] = {}
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def phase(self, name: str) -> Phase:
+        return Phase(self, name)
+
+    def add_phase(self, name: str, seconds: float, blocks: int, calls: int = 1):
+        phase = self.phases.setdefault(
+            name, {"seconds": 0.0, "allocated_blocks": 0, "calls": 0}
+        )
+        phase["seconds"] += seconds
+        phase["allocated_blocks"] += blocks
+        phase["calls"] += calls
+
+    def merge(self, other: Dict[str, Any]):
+        # folds in the as_dict() of a collector from another process
+        for name, n in other["counters"].items():
+            self.count(name, n)
+        for name, phase in other["phases"].items():
+            self.add_phase(
+                name, phase["seconds"], phase["allocated_blocks"], phase["calls"]
+            )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "counters": dict(self.counters),
+            "phases": {name: dict(phase) for name, phase in self.phases.items()},
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+# the collector instrumented code reports to; None (the default) disables
+# collection, leaving a single check per tile or per encoded image
+current: Optional[RenderStats] = None
+
+
+def count(name: str, n: int = 1):
+    if current is not None:
+        current.count(name, n)
+
+
+def phase(name: str) -> ContextManager:
+    return nullcontext() if current is None else current.phase(name)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current is None:
+                return fn(*args, **kwargs)
+            with current.phase(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def collect() -> Iterator[RenderStats]:
+    global current
+    previous, collector = current, RenderStats()
+    inversions = Matrix.inversions
+    current = collector
+    try:
+        yield collector
+    finally:
+        collector.count("matrix_inversions", Matrix.inversions - inversions)
+        current = previous
@@ -1,3 +1,5 @@
+from typing import List, Optional, Tuple as TypingTuple, Union
+
 from raytracer.transformation_matrix import (
     translation_matrix,
     scaling_matrix,
@@ -5,8 +7,10 @@ from raytracer.transformation_matrix import (
     rotation_y_matrix,
     rotation_z_matrix,
     shearing_matrix,
+    sin_cos,
 )
 from raytracer.matrix import Matrix
+from raytracer.tuple import Tuple
 
 
 def translation(x, y, z):
@@ -31,3 +35,113 @@ def rotation_z(r):
 
 def shearing(xy, xz, yx, yz, zx, zy):
     return Matrix(shearing_matrix(xy, xz, yx, yz, zx, zy))
+
+
+def view_transform(from_: Tuple, to: Tuple, up: Tuple) -> Matrix:
+    forward = (to - from_).normalize()
+    left = forward.cross(up.normalize())
+    true_up = left.cross(forward)
+    orientation = Matrix(
+        [
+            [left.x, left.y, left.z, 0],
+            [true_up.x, true_up.y, true_up.z, 0],
+            [-forward.x, -forward.y, -forward.z, 0],
+            [0, 0, 0, 1],
+        ]
+    )
+    return orientation * translation(-from_.x, -from_.y, -from_.z)
+
+
+class Transform:
+    # Records a fluent chain of transformations, applied in the same order as
+    # Matrix.identity().rotate_x(...).translate(...), and folds it into one
+    # affine matrix on first use. The matrix and its inverse are cached until
+    # another operation is recorded.
+    def __init__(self):
+        self.operations: List[TypingTuple[str, tuple]] = []
+        self._matrix: Optional[Matrix] = None
+        self._inverse: Optional[Matrix] = None
+
+    def _record(self, name: str, *args) -> "Transform":
+        self.operations.append((name, args))
+        self._matrix = None
+        self._inverse = None
+        return self
+
+    def translate(self, x, y, z) -> "Transform":
+        return self._record("translate", x, y, z)
+
+    def scale(self, x, y, z) -> "Transform":
+        return self._record("scale", x, y, z)
+
+    def rotate_x(self, r) -> "Transform":
+        return self._record("rotate_x", r)
+
+    def rotate_y(self, r) -> "Transform":
+        return self._record("rotate_y", r)
+
+    def rotate_z(self, r) -> "Transform":
+        return self._record("rotate_z", r)
+
+    def shear(self, xy, xz, yx, yz, zx, zy) -> "Transform":
+        return self._record("shear", xy, xz, yx, yz, zx, zy)
+
+    def matrix(self) -> Matrix:
+        if self._matrix is None:
+            self._matrix = Matrix(fold(self.operations))
+        return self._matrix
+
+    def inverse(self) -> Matrix:
+        if self._inverse is None:
+            self._inverse = self.matrix().inverse()
+        return self._inverse
+
+
+def fold(operations: List[TypingTuple[str, tuple]]) -> List[List[float]]:
+    # left-multiplies each operation into the top three rows of an affine
+    # matrix in place, touching only the rows the operation mixes
+    r0, r1, r2 = [1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]
+    for name, args in operations:
+        if name == "translate":
+            r0[3] += args[0]
+            r1[3] += args[1]
+            r2[3] += args[2]
+        elif name == "scale":
+            r0 = [v * args[0] for v in r0]
+            r1 = [v * args[1] for v in r1]
+            r2 = [v * args[2] for v in r2]
+        elif name == "rotate_x":
+            s, c = sin_cos(args[0])
+            r1, r2 = [c * a - s * b for a, b in zip(r1, r2)], [
+                s * a + c * b for a, b in zip(r1, r2)
+            ]
+        elif name == "rotate_y":
+            s, c = sin_cos(args[0])
+            r0, r2 = [c * a + s * b for a, b in zip(r0, r2)], [
+                c * b - s * a for a, b in zip(r0, r2)
+            ]
+        elif name == "rotate_z":
+            s, c = sin_cos(args[0])
+            r0, r1 = [c * a - s * b for a, b in zip(r0, r1)], [
+                s * a + c * b for a, b in zip(r0, r1)
+            ]
+        elif name == "shear":
+            xy, xz, yx, yz, zx, zy = args
+            r0, r1, r2 = (
+                [a + xy * b + xz * c for a, b, c in zip(r0, r1, r2)],
+                [yx * a + b + yz * c for a, b, c in zip(r0, r1, r2)],
+                [zx * a + zy * b + c for a, b, c in zip(r0, r1, r2)],
+            )
+        else:
+            raise ValueError(f"Unknown transformation: {name}")
+    return [r0, r1, r2, [0.0, 0.0, 0.0, 1.0]]
+
+
+def matrix_and_inverse(
+    transform: Union[Matrix, Transform],
+) -> TypingTuple[Matrix, Matrix]:
+    # lets transform setters take either a Matrix or a Transform, reusing the
+    # Transform's cached inverse instead of inverting again
+    if isinstance(transform, Transform):
+        return transform.matrix(), transform.inverse()
+    return transform, transform.inverse()
@@ -1,6 +1,13 @@
+from functools import lru_cache
 from math import cos, sin
 
 
+@lru_cache(maxsize=4096)
+def sin_cos(r: float) -> tuple[float, float]:
+    # memoized so that sweeps revisiting the same angles skip the trig calls
+    return sin(r), cos(r)
+
+
 def translation_matrix(x, y, z):
     return [[1, 0, 0, x], [0, 1, 0, y], [0, 0, 1, z], [0, 0, 0, 1]]
 
@@ -10,27 +17,30 @@ def scaling_matrix(x, y, z):
 
 
 def rotation_x_matrix(r):
+    s, c = sin_cos(r)
     return [
         [1, 0, 0, 0],
-        [0, cos(r), -sin(r), 0],
-        [0, sin(r), cos(r), 0],
+        [0, c, -s, 0],
+        [0, s, c, 0],
         [0, 0, 0, 1],
     ]
 
 
 def rotation_y_matrix(r):
+    s, c = sin_cos(r)
     return [
-        [cos(r), 0, sin(r), 0],
+        [c, 0, s, 0],
         [0, 1, 0, 0],
-        [-sin(r), 0, cos(r), 0],
+        [-s, 0, c, 0],
         [0, 0, 0, 1],
     ]
 
 
 def rotation_z_matrix(r):
+    s, c = sin_cos(r)
     return [
-        [cos(r), -sin(r), 0, 0],
-        [sin(r), cos(r), 0, 0],
+        [c, -s, 0, 0],
+        [s, c, 0, 0],
         [0, 0, 1, 0],
         [0, 0, 0, 1],
     ]
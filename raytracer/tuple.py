@@ -5,7 +5,23 @@ def nearly_equal(a: float, b: float) -> bool:
     return abs(a - b) < EPSILON
 
 
+_new = object.__new__
+
+
+def _make(cls, x: float, y: float, z: float, w: float):
+    # fast path for internal callers that already hold floats: skips
+    # __init__ and its float() coercion
+    t = _new(cls)
+    t.x = x
+    t.y = y
+    t.z = z
+    t.w = w
+    return t
+
+
 class Tuple:
+    __slots__ = ("x", "y", "z", "w")
+
     def __init__(self, x, y, z, w):
         self.x = float(x)
         self.y = float(y)
@@ -26,25 +42,37 @@ class Tuple:
         )
 
     def __add__(self, other: "Tuple") -> "Tuple":
-        return Tuple(
-            self.x + other.x, self.y + other.y, self.z + other.z, self.w + other.w
+        return _make(
+            Tuple,
+            self.x + other.x,
+            self.y + other.y,
+            self.z + other.z,
+            self.w + other.w,
         )
 
     def __sub__(self, other: "Tuple") -> "Tuple":
-        return Tuple(
-            self.x - other.x, self.y - other.y, self.z - other.z, self.w - other.w
+        return _make(
+            Tuple,
+            self.x - other.x,
+            self.y - other.y,
+            self.z - other.z,
+            self.w - other.w,
         )
 
     def __neg__(self) -> "Tuple":
-        return Tuple(-self.x, -self.y, -self.z, -self.w)
+        return _make(Tuple, -self.x, -self.y, -self.z, -self.w)
 
     def __mul__(self, scalar: float) -> "Tuple":
-        return Tuple(self.x * scalar, self.y * scalar, self.z * scalar, self.w * scalar)
+        return _make(
+            Tuple, self.x * scalar, self.y * scalar, self.z * scalar, self.w * scalar
+        )
 
     __rmul__ = __mul__
 
     def __truediv__(self, scalar: float) -> "Tuple":
-        return Tuple(self.x / scalar, self.y / scalar, self.z / scalar, self.w / scalar)
+        return _make(
+            Tuple, self.x / scalar, self.y / scalar, self.z / scalar, self.w / scalar
+        )
 
     def magnitude(self) -> float:
         return (self.x ** 2 + self.y ** 2 + self.z ** 2 + self.w ** 2) ** 0.5
@@ -59,10 +87,12 @@ class Tuple:
         return self.x * other.x + self.y * other.y + self.z * other.z + self.w * other.w
 
     def cross(self, other: "Tuple") -> "Tuple":
-        return vector(
+        return _make(
+            Vector,
             self.y * other.z - self.z * other.y,
             self.z * other.x - self.x * other.z,
             self.x * other.y - self.y * other.x,
+            0.0,
         )
 
     def is_point(self) -> bool:
@@ -76,21 +106,31 @@ class Tuple:
 
 
 class Point(Tuple):
+    __slots__ = ()
+
     def __init__(self, x: float, y: float, z: float):
-        super().__init__(x, y, z, 1.0)
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.w = 1.0
 
     def __add__(self, other: "Tuple") -> "Point":
         if not isinstance(other, Vector):
             raise TypeError("Can only add Vector to Point")
-        return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+        return _make(Point, self.x + other.x, self.y + other.y, self.z + other.z, 1.0)
 
 
 class Vector(Tuple):
+    __slots__ = ()
+
     def __init__(self, x: float, y: float, z: float):
-        super().__init__(x, y, z, 0.0)
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.w = 0.0
 
     def __mul__(self, scalar: float) -> "Vector":
-        return Vector(self.x * scalar, self.y * scalar, self.z * scalar)
+        return _make(Vector, self.x * scalar, self.y * scalar, self.z * scalar, 0.0)
 
     __rmul__ = __mul__
 
@@ -104,20 +144,32 @@ def vector(x: float, y: float, z: float) -> Vector:
 
 
 class Color(Tuple):
+    __slots__ = ()
+
     def __init__(self, red, green, blue):
-        super().__init__(red, green, blue, 0.0)
-        self.red = self.x
-        self.green = self.y
-        self.blue = self.z
+        self.x = float(red)
+        self.y = float(green)
+        self.z = float(blue)
+        self.w = 0.0
+
+    @property
+    def red(self) -> float:
+        return self.x
+
+    @property
+    def green(self) -> float:
+        return self.y
+
+    @property
+    def blue(self) -> float:
+        return self.z
 
     def hadamard_product(self, other):
-        return Color(
-            self.red * other.red, self.green * other.green, self.blue * other.blue
-        )
+        return _make(Color, self.x * other.x, self.y * other.y, self.z * other.z, 0.0)
 
     def __mul__(self, other):
         if isinstance(other, (int, float)):
-            return Color(self.red * other, self.green * other, self.blue * other)
+            return _make(Color, self.x * other, self.y * other, self.z * other, 0.0)
         elif isinstance(other, Color):
             return self.hadamard_product(other)
         else:
@@ -125,8 +177,8 @@ class Color(Tuple):
 
     def __add__(self, other):
         if isinstance(other, Color):
-            return Color(
-                self.red + other.red, self.green + other.green, self.blue + other.blue
+            return _make(
+                Color, self.x + other.x, self.y + other.y, self.z + other.z, 0.0
             )
         else:
             return NotImplemented
@@ -0,0 +1,318 @@
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from raytracer import stats
+from raytracer.bvh import BVH, INF
+from raytracer.intersection import Intersection, IntersectionBuffer
+from raytracer.light import Light
+from raytracer.packet import Packets, world_spheres
+from raytracer.precision import as_float, epsilon
+from raytracer.ray import Ray
+from raytracer.shape import Shape
+from raytracer.tuple import EPSILON, Color, Point, Vector, _make
+
+
+class Objects(List[Shape]):
+    # a world's shapes; counts the changes made to the list so that the
+    # world can tell when its acceleration structures went stale
+    changes = 0
+
+    def _changed(self):
+        self.changes += 1
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, shapes):  # type: ignore
+        self.extend(shapes)
+        return self
+
+    def __imul__(self, n):  # type: ignore
+        result = super().__imul__(n)
+        self._changed()
+        return result
+
+    def append(self, shape: Shape):
+        super().append(shape)
+        self._changed()
+
+    def extend(self, shapes: Iterable[Shape]):
+        super().extend(shapes)
+        self._changed()
+
+    def insert(self, index, shape: Shape):
+        super().insert(index, shape)
+        self._changed()
+
+    def pop(self, index=-1) -> Shape:
+        shape = super().pop(index)
+        self._changed()
+        return shape
+
+    def remove(self, shape: Shape):
+        super().remove(shape)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+
+class World:
+    def __init__(self):
+        self.objects = Objects()
+        self.lights: List[Light] = []
+        self._bvh: Optional[BVH] = None
+        self._bvh_generation = -1
+        self._spheres: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._spheres_generation = -1
+        # see generation()
+        self._generation = 0
+        self._checked: Tuple[int, int] = (-1, -1)
+        self._versions: Tuple[Tuple[Shape, int], ...] = ()
+
+    @property
+    def objects(self) -> Objects:
+        return self._objects
+
+    @objects.setter
+    def objects(self, shapes: Iterable[Shape]):
+        self._objects = Objects(shapes)
+
+    @property
+    def light(self) -> Optional[Light]:
+        return self.lights[0] if self.lights else None
+
+    @light.setter
+    def light(self, light: Optional[Light]):
+        self.lights = [] if light is None else [light]
+
+    def generation(self) -> int:
+        # bumped whenever this world's objects, their order or their
+        # transforms change. Cheap enough to call per ray: the shapes are
+        # only compared when the list or some shape's transform changed
+        # since the last call, and changes to other worlds' shapes never
+        # bump it.
+        checked = (self.objects.changes, Shape.transform_changes)
+        if checked != self._checked:
+            self._checked = checked
+            versions = tuple((shape, shape.version) for shape in self.objects)
+            if len(versions) != len(self._versions) or any(
+                shape is not seen or version != seen_version
+                for (shape, version), (seen, seen_version) in zip(
+                    versions, self._versions
+                )
+            ):
+                self._generation += 1
+            self._versions = versions
+        return self._generation
+
+    @property
+    def bvh(self) -> BVH:
+        # rebuilt lazily when the world's objects or their transforms change
+        generation = self.generation()
+        if self._bvh is None or generation != self._bvh_generation:
+            self._bvh = BVH(self.objects)
+            self._bvh_generation = generation
+        return self._bvh
+
+    @property
+    def spheres(self) -> Tuple[np.ndarray, np.ndarray]:
+        # centers and radii of world-space spheres enclosing each object, in
+        # self.objects order, for packet culling; like the BVH, rebuilt
+        # lazily when the world's objects or their transforms change
+        generation = self.generation()
+        if self._spheres is None or generation != self._spheres_generation:
+            self._spheres = world_spheres(self.objects)
+            self._spheres_generation = generation
+        return self._spheres
+
+    def invalidate(self):
+        self._bvh = None
+        self._spheres = None
+
+    def intersect(self, ray: Ray) -> List[Intersection]:
+        # every intersection along the ray's line, negative t included; only
+        # the hit-finding paths cull shapes behind the origin
+        xs: List[Intersection] = []
+        for shape in self.bvh.candidates(ray, -INF):
+            xs.extend(shape.intersect(ray))
+        xs.sort(key=lambda x: x.t)
+        return xs
+
+    def intersect_into(
+        self, ray: Ray, buffer: IntersectionBuffer
+    ) -> IntersectionBuffer:
+        # like intersect() but fills a reusable buffer with t values and
+        # indices into self.objects instead of allocating Intersections
+        buffer.clear()
+        bvh = self.bvh
+        for slot in bvh.candidate_slots(ray, -INF):
+            ts = bvh.shapes[slot].intersect_ts(ray)
+            if ts is not None:
+                buffer.append(ts[0], bvh.ids[slot])
+                buffer.append(ts[1], bvh.ids[slot])
+        return buffer
+
+    def nearest_hit(
+        self, ray: Ray, t_min: float = 0.0, t_max: float = float("inf")
+    ) -> Optional[Intersection]:
+        bvh = self.bvh
+        t, slot = bvh.nearest(ray, t_min, t_max)
+        return None if slot < 0 else Intersection(t, bvh.shapes[slot])
+
+    def color_at(self, ray: Ray) -> Color:
+        _hit = self.nearest_hit(ray)
+        if _hit is None:
+            return Color(0, 0, 0)
+        return self.shade_hit(ray, _hit)
+
+    def shade_hit(self, ray: Ray, _hit: Intersection) -> Color:
+        point = ray.position(_hit.t)
+        normal = _hit.object.normal_at(point)
+        eye = -ray.direction
+        # shadow rays start just above the surface so that it cannot shadow
+        # itself through rounding error
+        over_point = _make(
+            Point,
+            point.x + normal.x * EPSILON,
+            point.y + normal.y * EPSILON,
+            point.z + normal.z * EPSILON,
+            1.0,
+        )
+        color = Color(0, 0, 0)
+        for light in self.lights:
+            shadowed = self.is_shadowed(over_point, light)
+            color += _hit.object.material.lighting(light, point, eye, normal, shadowed)
+        return color
+
+    def is_shadowed(self, point: Point, light: Optional[Light] = None) -> bool:
+        # any-hit query between the point and the light (the first light by
+        # default), so the blockers found are never sorted or even all found;
+        # nothing shadows a point without a light or at the light itself
+        if light is None:
+            if not self.lights:
+                return False
+            light = self.lights[0]
+        v = light.position - point
+        distance = v.magnitude()
+        if distance == 0:
+            return False
+        direction = _make(Vector, v.x / distance, v.y / distance, v.z / distance, 0.0)
+        ray = Ray(point, direction)
+        return self.bvh.any_hit(ray, 0.0, distance)
+
+    def color_at_batch(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        packets: Optional[Packets] = None,
+    ) -> np.ndarray:
+        # color_at() for (N, 3) arrays of rays, computed at the arrays'
+        # precision; every object is intersected with the whole batch (or
+        # the packets that may hit it), then hits are shaded per object
+        origins = as_float(origins)[:, :3]
+        directions = as_float(directions)[:, :3]
+        nearest, owner = self.intersect_batch(origins, directions, packets)
+        return self.shade_batch(origins, directions, nearest, owner)
+
+    def intersect_batch(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        packets: Optional[Packets] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # nearest non-negative t per ray and the index into self.objects of
+        # the shape hit there (inf and -1 for misses). With `packets` an
+        # object is only tested against the rays of packets whose cone
+        # reaches its bounding sphere.
+        nearest = np.full(len(origins), np.inf, dtype=origins.dtype)
+        owner = np.full(len(origins), -1)
+        visible = None
+        if packets is not None and self.objects:
+            visible = packets.visible(*self.spheres)
+            stats.count("packet_tests", visible.size)
+            stats.count("culled_packet_tests", visible.size - int(visible.sum()))
+        for index, shape in enumerate(self.objects):
+            rays = None
+            if packets is not None and visible is not None:
+                if not visible[:, index].any():
+                    continue
+                rays = np.flatnonzero(packets.rays(visible[:, index]))
+                # gathering nearly all of the rays costs more than it saves
+                if 4 * len(rays) > 3 * len(origins):
+                    rays = None
+            if rays is None:
+                t0, t1, _ = shape.intersect_batch(origins, directions)
+            else:
+                # np.take gathers rows several times faster than indexing
+                t0, t1, _ = shape.intersect_batch(
+                    np.take(origins, rays, axis=0), np.take(directions, rays, axis=0)
+                )
+            stats.count("intersection_tests", len(t0))
+            t = np.where(t0 >= 0, t0, t1)
+            closer = (t >= 0) & (t < (nearest if rays is None else nearest[rays]))
+            hit = closer if rays is None else rays[closer]
+            nearest[hit] = t[closer]
+            owner[hit] = index
+        return nearest, owner
+
+    def shade_batch(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        nearest: np.ndarray,
+        owner: np.ndarray,
+    ) -> np.ndarray:
+        colors = np.zeros((len(origins), 3), dtype=origins.dtype)
+        offset = epsilon(origins.dtype)
+        for index in np.unique(owner[owner >= 0]):
+            shape = self.objects[index]
+            selected = owner == index
+            points = origins[selected] + directions[selected] * nearest[selected, None]
+            normals = shape.normal_at_batch(points)
+            eyes = -directions[selected]
+            over_points = points + normals * offset
+            for light in self.lights:
+                shadowed = self.is_shadowed_batch(over_points, light)
+                colors[selected] += shape.material.lighting_batch(
+                    light, points, eyes, normals, shadowed
+                )
+        return colors
+
+    def is_shadowed_batch(self, points: np.ndarray, light: Light) -> np.ndarray:
+        # is_shadowed() for an (N, 3) array of points; each object is only
+        # tested against the shadow rays no earlier object has blocked
+        position = light.position
+        light_position = [position.x, position.y, position.z]
+        directions = np.array(light_position, dtype=points.dtype) - points
+        distances = np.linalg.norm(directions, axis=1)
+        # points at the light itself are never shadowed and never tested
+        at_light = distances == 0
+        directions /= np.where(at_light, 1, distances)[:, None]
+        blocked = np.zeros(len(points), dtype=bool)
+        for shape in self.objects:
+            remaining = np.flatnonzero(~blocked & ~at_light)
+            if not len(remaining):
+                break
+            stats.count("shadow_tests", len(remaining))
+            t0, t1, _ = shape.intersect_batch(points[remaining], directions[remaining])
+            distance = distances[remaining]
+            blocked[remaining] = ((t0 >= 0) & (t0 <= distance)) | (
+                (t1 >= 0) & (t1 <= distance)
+            )
+        return blocked
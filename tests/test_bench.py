@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+
+from raytracer.bench import BENCHMARKS, compare, main
+
+
+class TestBench(unittest.TestCase):
+    def test_benchmarks_cover_hot_paths(self):
+        for name in (
+            "tuple_add",
+            "matrix_mul",
+            "matrix_inverse",
+            "sphere_intersect",
+            "material_lighting",
+            "canvas_to_ppm",
+            "render_32",
+            "render_128",
+        ):
+            self.assertIn(name, BENCHMARKS)
+
+    def test_compare_flags_drop_beyond_threshold(self):
+        baseline = {"a": {"value": 100.0}, "b": {"value": 100.0}}
+        results = {"a": {"value": 85.0}, "b": {"value": 75.0}}
+        regressions = compare(results, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b:"))
+
+    def test_compare_ignores_improvements_and_new_benchmarks(self):
+        baseline = {"a": {"value": 100.0}}
+        results = {"a": {"value": 250.0}, "new": {"value": 1.0}}
+        self.assertEqual(compare(results, baseline), [])
+
+    def test_main_saves_and_checks_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, "baseline.json")
+            output = os.path.join(directory, "results.json")
+            args = ["tuple_add", "--baseline", baseline, "--repeat", "1"]
+            self.assertEqual(main(args + ["--save-baseline"]), 0)
+            with open(baseline) as f:
+                report = json.load(f)
+            self.assertEqual(list(report["results"]), ["tuple_add"])
+            self.assertEqual(report["results"]["tuple_add"]["unit"], "ops/s")
+
+            report["results"]["tuple_add"]["value"] *= 1000
+            with open(baseline, "w") as f:
+                json.dump(report, f)
+            self.assertEqual(main(args + ["--output", output]), 1)
+            self.assertTrue(os.path.exists(output))
+
+    def test_main_fails_without_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, "missing.json")
+            args = ["tuple_add", "--baseline", baseline, "--repeat", "1"]
+            self.assertEqual(main(args), 2)
@@ -0,0 +1,37 @@
+from math import pi, sqrt
+import unittest
+
+from raytracer.bounds import Bounds
+from raytracer.sphere import Sphere
+from raytracer.transformation import rotation_z, scaling, translation
+
+
+class TestBounds(unittest.TestCase):
+    def test_sphere_has_unit_bounds(self):
+        s = Sphere()
+        self.assertEqual(s.bounds(), Bounds((-1, -1, -1), (1, 1, 1)))
+
+    def test_bounds_corners(self):
+        b = Bounds((0, 0, 0), (1, 2, 3))
+        corners = {tuple(c) for c in b.corners().tolist()}
+        self.assertEqual(len(corners), 8)
+        self.assertIn((0, 0, 0), corners)
+        self.assertIn((1, 2, 3), corners)
+        self.assertIn((1, 0, 3), corners)
+
+    def test_world_bounds_of_translated_and_scaled_sphere(self):
+        s = Sphere()
+        s.transform = translation(1, -2, 3) * scaling(0.5, 2, 1)
+        self.assertEqual(s.world_bounds(), Bounds((0.5, -4, 2), (1.5, 0, 4)))
+
+    def test_world_bounds_of_rotated_sphere_enclose_corners(self):
+        s = Sphere()
+        s.transform = rotation_z(pi / 4)
+        self.assertEqual(
+            s.world_bounds(), Bounds((-sqrt(2), -sqrt(2), -1), (sqrt(2), sqrt(2), 1))
+        )
+
+    def test_centroid_and_surface_area(self):
+        b = Bounds((0, 0, 0), (1, 2, 3))
+        self.assertEqual(b.centroid().tolist(), [0.5, 1, 1.5])
+        self.assertEqual(b.surface_area(), 22)
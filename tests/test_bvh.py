@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+
+from raytracer.bvh import BVH, world_bounds
+from raytracer.ray import Ray
+from raytracer.sphere import Sphere
+from raytracer.transformation import rotation_x, scaling, translation
+from raytracer.tuple import Point, Vector
+
+
+def random_spheres(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    shapes = []
+    for position, radius in zip(rng.uniform(-5, 5, (n, 3)), rng.uniform(0.1, 0.4, n)):
+        s = Sphere()
+        s.transform = translation(*position) * scaling(radius, radius * 2, radius)
+        shapes.append(s)
+    return shapes
+
+
+class TestBVH(unittest.TestCase):
+    def test_world_bounds_match_per_shape_bounds(self):
+        shapes = random_spheres(10)
+        shapes[3].transform = shapes[3].transform * rotation_x(0.7)
+        bounds = world_bounds(shapes)
+        for shape, (minimum, maximum) in zip(shapes, bounds):
+            b = shape.world_bounds()
+            self.assertTrue(np.allclose(minimum, b.minimum))
+            self.assertTrue(np.allclose(maximum, b.maximum))
+
+    def test_empty_bvh_has_no_candidates(self):
+        bvh = BVH([])
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertEqual(list(bvh.candidates(r)), [])
+
+    def test_every_shape_lands_in_exactly_one_leaf(self):
+        shapes = random_spheres(200)
+        bvh = BVH(shapes)
+        self.assertEqual(len(bvh.shapes), 200)
+        self.assertEqual({id(s) for s in bvh.shapes}, {id(s) for s in shapes})
+        self.assertTrue(all(n <= bvh.leaf_size for n in bvh.count))
+
+    def test_candidates_include_every_shape_the_ray_hits(self):
+        shapes = random_spheres(300)
+        bvh = BVH(shapes)
+        rng = np.random.default_rng(1)
+        for origin, target in zip(
+            rng.uniform(-6, 6, (100, 3)), rng.uniform(-4, 4, (100, 3))
+        ):
+            r = Ray(Point(*origin), Vector(*(target - origin)).normalize())
+            candidates = list(bvh.candidates(r))
+            for shape in shapes:
+                if any(x.t >= 0 for x in shape.intersect(r)):
+                    self.assertIn(shape, candidates)
+
+    def test_candidates_skip_most_shapes(self):
+        shapes = random_spheres(1000)
+        bvh = BVH(shapes)
+        r = Ray(Point(0, 0, -10), Vector(0, 0, 1))
+        self.assertLess(len(list(bvh.candidates(r))), 100)
+
+    def test_ray_parallel_to_slab_outside_box_misses(self):
+        s = Sphere()
+        bvh = BVH([s])
+        self.assertEqual(
+            list(bvh.candidates(Ray(Point(0, 2, -5), Vector(0, 0, 1)))), []
+        )
+        self.assertEqual(list(bvh.candidates(Ray(Point(0, 0, 5), Vector(0, 0, 1)))), [])
+        self.assertEqual(
+            list(bvh.candidates(Ray(Point(0, 0.5, -5), Vector(0, 0, 1)))), [s]
+        )
+
+    def test_any_hit_agrees_with_nearest(self):
+        shapes = random_spheres(200)
+        bvh = BVH(shapes)
+        rng = np.random.default_rng(4)
+        for origin, target in zip(
+            rng.uniform(-6, 6, (100, 3)), rng.uniform(-4, 4, (100, 3))
+        ):
+            r = Ray(Point(*origin), Vector(*(target - origin)).normalize())
+            for t_max in (0.5, 3.0, float("inf")):
+                _, slot = bvh.nearest(r, 0.0, t_max)
+                self.assertEqual(bvh.any_hit(r, 0.0, t_max), slot >= 0)
+        self.assertFalse(BVH([]).any_hit(Ray(Point(0, 0, 0), Vector(0, 0, 1))))
+
+    def test_any_hit_stops_at_first_blocker(self):
+        shapes = []
+        for z in range(20):
+            s = Sphere()
+            s.transform = translation(0, 0, z * 3) * scaling(0.5, 0.5, 0.5)
+            shapes.append(s)
+        bvh = BVH(shapes, leaf_size=1)
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        assert bvh.any_hit(r)
+        self.assertLess(bvh.tests, 5)
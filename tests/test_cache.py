@@ -0,0 +1,108 @@
+from math import pi
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from raytracer import stats
+from raytracer.cache import RenderCache, scene_key
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas
+from raytracer.render import render, render_antialiased
+from raytracer.transformation import scaling, view_transform
+from raytracer.tuple import Color, Point, Vector
+from tests.test_world import default_world
+
+
+def camera(size: int = 8) -> Camera:
+    c = Camera(size, size, pi / 3)
+    c.transform = view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    return c
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_equal_scenes_have_equal_keys(self):
+        key = scene_key(default_world(), camera(), Canvas(8, 8), {})
+        self.assertEqual(key, scene_key(default_world(), camera(), Canvas(8, 8), {}))
+
+    def test_key_changes_with_anything_that_changes_the_pixels(self):
+        key = scene_key(default_world(), camera(), Canvas(8, 8), {})
+        w = default_world()
+        w.objects[1].transform = scaling(0.5, 0.5, 0.6)
+        self.assertNotEqual(key, scene_key(w, camera(), Canvas(8, 8), {}))
+        w = default_world()
+        w.objects[0].material.shininess = 100
+        self.assertNotEqual(key, scene_key(w, camera(), Canvas(8, 8), {}))
+        w = default_world()
+        w.light.intensity = Color(1, 1, 0.9)
+        self.assertNotEqual(key, scene_key(w, camera(), Canvas(8, 8), {}))
+        c = Camera(9, 9, pi / 3)
+        self.assertNotEqual(key, scene_key(default_world(), c, Canvas(9, 9), {}))
+        canvas = Canvas(8, 8, dtype=np.float32)
+        self.assertNotEqual(key, scene_key(default_world(), camera(), canvas, {}))
+        options = {"batch": True}
+        self.assertNotEqual(
+            key, scene_key(default_world(), camera(), Canvas(8, 8), options)
+        )
+        options = {"workers": 2, "tile": 3}
+        self.assertEqual(
+            key, scene_key(default_world(), camera(), Canvas(8, 8), options)
+        )
+
+    def test_hit_returns_memory_mapped_framebuffer(self):
+        cache = RenderCache(self.directory.name)
+        expected = render(default_world(), camera(), Canvas(8, 8))
+        first = cache.render(default_world(), camera(), Canvas(8, 8))
+        with stats.collect() as collector:
+            second = cache.render(default_world(), camera(), Canvas(8, 8))
+        self.assertEqual(collector.counters["cache_hits"], 1)
+        self.assertNotIn("rays", collector.counters)
+        assert isinstance(second.pixels, np.memmap)
+        self.assertTrue(np.array_equal(first.pixels, expected.pixels))
+        self.assertTrue(np.array_equal(second.pixels, expected.pixels))
+        self.assertEqual(second.to_ppm(), expected.to_ppm())
+
+    def test_hit_canvas_is_writable_without_touching_cache(self):
+        cache = RenderCache(self.directory.name)
+        cache.render(default_world(), camera(), Canvas(8, 8))
+        hit = cache.render(default_world(), camera(), Canvas(8, 8))
+        hit.write_pixel(0, 0, Color(1, 1, 1))
+        render(default_world(), camera(), hit)
+        hit.write_pixel(4, 4, Color(0, 0, 0))
+        again = cache.render(default_world(), camera(), Canvas(8, 8))
+        expected = render(default_world(), camera(), Canvas(8, 8))
+        self.assertTrue(np.array_equal(again.pixels, expected.pixels))
+
+    def test_render_function_is_part_of_key(self):
+        cache = RenderCache(self.directory.name)
+        cache.render(default_world(), camera(), Canvas(8, 8))
+        with stats.collect() as collector:
+            cache.render(
+                default_world(), camera(), Canvas(8, 8), render_antialiased, samples=2
+            )
+        self.assertEqual(collector.counters["cache_misses"], 1)
+        self.assertEqual(len(cache.entries()), 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        pixels = np.zeros((8, 8, 3))
+        cache = RenderCache(self.directory.name)
+        for key in "abc":
+            cache.put(key, pixels)
+        entry_size = cache.size() // 3
+        cache.max_bytes = 3 * entry_size
+        assert cache.get("a") is not None
+        cache.put("d", pixels)
+        names = sorted(entry.name for entry in cache.entries())
+        self.assertEqual(names, ["a.npy", "c.npy", "d.npy"])
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+        self.assertIsNone(cache.get("b"))
+
+    def test_no_temporary_files_are_left_behind(self):
+        cache = RenderCache(self.directory.name)
+        cache.put("a", np.zeros((2, 2, 3)))
+        self.assertEqual(os.listdir(self.directory.name), ["a.npy"])
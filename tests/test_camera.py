@@ -0,0 +1,76 @@
+from math import pi, sqrt
+import unittest
+
+import numpy as np
+
+from raytracer.camera import Camera
+from raytracer.matrix import Matrix
+from raytracer.transformation import rotation_y, translation, view_transform
+from raytracer.tuple import EPSILON, Point, Vector, nearly_equal
+
+
+class TestCamera(unittest.TestCase):
+    def test_constructing_camera(self):
+        c = Camera(160, 120, pi / 2)
+        self.assertEqual(c.hsize, 160)
+        self.assertEqual(c.vsize, 120)
+        self.assertEqual(c.field_of_view, pi / 2)
+        self.assertEqual(c.transform, Matrix.identity())
+
+    def test_pixel_size_for_horizontal_canvas(self):
+        c = Camera(200, 125, pi / 2)
+        self.assertTrue(nearly_equal(c.pixel_size, 0.01))
+
+    def test_pixel_size_for_vertical_canvas(self):
+        c = Camera(125, 200, pi / 2)
+        self.assertTrue(nearly_equal(c.pixel_size, 0.01))
+
+    def test_ray_through_center_of_canvas(self):
+        c = Camera(201, 101, pi / 2)
+        r = c.ray_for_pixel(100, 50)
+        self.assertEqual(r.origin, Point(0, 0, 0))
+        self.assertEqual(r.direction, Vector(0, 0, -1))
+
+    def test_ray_through_corner_of_canvas(self):
+        c = Camera(201, 101, pi / 2)
+        r = c.ray_for_pixel(0, 0)
+        self.assertEqual(r.origin, Point(0, 0, 0))
+        self.assertEqual(r.direction, Vector(0.66519, 0.33259, -0.66851))
+
+    def test_ray_when_camera_is_transformed(self):
+        c = Camera(201, 101, pi / 2)
+        c.transform = rotation_y(pi / 4) * translation(0, -2, 5)
+        r = c.ray_for_pixel(100, 50)
+        self.assertEqual(r.origin, Point(0, 2, -5))
+        self.assertEqual(r.direction, Vector(sqrt(2) / 2, 0, -sqrt(2) / 2))
+
+    def test_rays_for_rows_match_ray_for_pixel(self):
+        c = Camera(21, 11, pi / 3)
+        c.transform = view_transform(Point(1, 2, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        origins, directions = c.rays_for_rows(3, 7)
+        self.assertEqual(origins.shape, (4 * 21, 3))
+        self.assertEqual(directions.shape, (4 * 21, 3))
+        for i, (y, x) in enumerate(np.ndindex(4, 21)):
+            r = c.ray_for_pixel(x, y + 3)
+            self.assertTrue(
+                np.allclose(
+                    origins[i], (r.origin.x, r.origin.y, r.origin.z), atol=EPSILON
+                )
+            )
+            self.assertTrue(
+                np.allclose(
+                    directions[i],
+                    (r.direction.x, r.direction.y, r.direction.z),
+                    atol=EPSILON,
+                )
+            )
+
+    def test_rays_for_rows_restricted_to_columns(self):
+        c = Camera(201, 101, pi / 2)
+        origins, directions = c.rays_for_rows(50, 51, 100, 101)
+        self.assertEqual(origins.tolist(), [[0, 0, 0]])
+        self.assertTrue(np.allclose(directions, [[0, 0, -1]]))
+        _, corner = c.rays_for_rows(0, 1, 0, 1)
+        self.assertTrue(
+            np.allclose(corner, [[0.66519, 0.33259, -0.66851]], atol=EPSILON)
+        )
@@ -1,5 +1,15 @@
+import io
+from math import ceil
+import os
+import tempfile
+import struct
+import tracemalloc
 import unittest
-from raytracer.canvas import Canvas
+import zlib
+
+import numpy as np
+
+from raytracer.canvas import Canvas, MemmapCanvas
 from raytracer.tuple import Color
 
 
@@ -8,7 +18,9 @@ class TestCanvas(unittest.TestCase):
         c = Canvas(10, 20)
         assert c.width == 10
         assert c.height == 20
-        assert all(pixel == Color(0, 0, 0) for row in c.grid for pixel in row)
+        assert c.pixels.shape == (20, 10, 3)
+        assert not c.pixels.any()
+        assert c.pixel_at(9, 19) == Color(0, 0, 0)
 
     def test_write_pixel(self):
         c = Canvas(10, 20)
@@ -16,6 +28,36 @@ class TestCanvas(unittest.TestCase):
         c.write_pixel(2, 3, red)
         assert c.pixel_at(2, 3) == red
 
+    def test_canvas_with_single_precision_storage(self):
+        c = Canvas(4, 2, dtype=np.float32)
+        assert c.pixels.dtype == np.float32
+        c.write_pixel(3, 1, Color(0.5, 0.25, 1))
+        assert c.pixel_at(3, 1) == Color(0.5, 0.25, 1)
+
+    def test_write_rows(self):
+        c = Canvas(4, 3)
+        rows = np.zeros((2, 4, 3))
+        rows[:, :, 1] = 0.5
+        c.write_rows(1, rows)
+        assert c.pixel_at(0, 0) == Color(0, 0, 0)
+        assert c.pixel_at(0, 1) == Color(0, 0.5, 0)
+        assert c.pixel_at(3, 2) == Color(0, 0.5, 0)
+
+    def test_write_rows_rejects_wrong_width(self):
+        c = Canvas(4, 3)
+        with self.assertRaises(ValueError):
+            c.write_rows(0, np.zeros((1, 5, 3)))
+
+    def test_write_block(self):
+        c = Canvas(6, 5)
+        block = np.ones((2, 3, 3))
+        c.write_block(2, 1, block)
+        assert c.pixel_at(2, 1) == Color(1, 1, 1)
+        assert c.pixel_at(4, 2) == Color(1, 1, 1)
+        assert c.pixel_at(1, 1) == Color(0, 0, 0)
+        assert c.pixel_at(5, 1) == Color(0, 0, 0)
+        assert c.pixel_at(2, 3) == Color(0, 0, 0)
+
     def test_constructing_ppm_header(self):
         c = Canvas(5, 3)
         ppm = c.to_ppm()
@@ -60,3 +102,135 @@ class TestCanvas(unittest.TestCase):
         c = Canvas(5, 3)
         ppm = c.to_ppm()
         assert ppm.endswith("\n")
+
+    def test_write_ppm_to_text_and_binary_files(self):
+        c = Canvas(10, 2)
+        c.write_pixel(3, 1, Color(1, 0.8, 0.6))
+        text = io.StringIO()
+        c.write_ppm(text)
+        binary = io.BytesIO()
+        c.write_ppm(binary)
+        assert text.getvalue() == c.to_ppm()
+        assert binary.getvalue() == c.to_ppm().encode("ascii")
+
+    def test_write_ppm_is_independent_of_chunk_size(self):
+        c = Canvas(7, 5)
+        c.pixels[:] = np.random.default_rng(3).uniform(-0.2, 1.2, (5, 7, 3))
+        whole = io.StringIO()
+        c.write_ppm(whole, rows_per_chunk=5)
+        rows = io.StringIO()
+        c.write_ppm(rows, rows_per_chunk=1)
+        assert whole.getvalue() == rows.getvalue()
+
+    def test_ppm_matches_per_pixel_encoding(self):
+        c = Canvas(37, 4)
+        c.pixels[:] = np.random.default_rng(5).uniform(-0.2, 1.2, (4, 37, 3))
+        expected = f"P3\n{c.width} {c.height}\n255\n"
+        for y in range(c.height):
+            line = ""
+            for x in range(c.width):
+                pixel = c.pixel_at(x, y)
+                for channel in (pixel.red, pixel.green, pixel.blue):
+                    value = str(min(255, max(0, ceil(channel * 255))))
+                    if len(line) + len(value) > 70:
+                        expected += line.rstrip() + "\n"
+                        line = ""
+                    line += value + " "
+            expected += line.rstrip() + "\n"
+        assert c.to_ppm() == expected
+
+    def test_constructing_p6(self):
+        c = Canvas(2, 2)
+        c.write_pixel(0, 0, Color(1.5, 0, 0))
+        c.write_pixel(1, 1, Color(0, 0.5, -1))
+        p6 = c.to_p6()
+        assert p6.startswith(b"P6\n2 2\n255\n")
+        assert p6[len(b"P6\n2 2\n255\n") :] == bytes(
+            [255, 0, 0, 0, 0, 0, 0, 0, 0, 0, 128, 0]
+        )
+
+    def test_p6_matches_p3_values(self):
+        c = Canvas(9, 4)
+        c.pixels[:] = np.random.default_rng(11).uniform(-0.2, 1.2, (4, 9, 3))
+        p3_values = [int(v) for v in c.to_ppm().split()[4:]]
+        p6 = c.to_p6()
+        assert list(p6[len(p6) - 9 * 4 * 3 :]) == p3_values
+
+    def test_constructing_png(self):
+        c = Canvas(3, 2)
+        c.write_pixel(2, 0, Color(1, 0.5, 0))
+        png = c.to_png()
+        assert png.startswith(b"\x89PNG\r\n\x1a\n")
+        chunks = []
+        offset = 8
+        while offset < len(png):
+            (length,) = struct.unpack(">I", png[offset : offset + 4])
+            tag = png[offset + 4 : offset + 8]
+            data = png[offset + 8 : offset + 8 + length]
+            (crc,) = struct.unpack(
+                ">I", png[offset + 8 + length : offset + 12 + length]
+            )
+            assert crc == zlib.crc32(tag + data)
+            chunks.append((tag, data))
+            offset += 12 + length
+        assert chunks[0] == (b"IHDR", struct.pack(">IIBBBBB", 3, 2, 8, 2, 0, 0, 0))
+        assert chunks[-1] == (b"IEND", b"")
+        idat = b"".join(data for tag, data in chunks if tag == b"IDAT")
+        assert zlib.decompress(idat) == bytes(
+            [0, 0, 0, 0, 0, 0, 0, 255, 128, 0] + [0] * 10
+        )
+
+    def test_memmap_canvas_is_file_backed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "canvas.npy")
+            c = MemmapCanvas(5, 3, path, dtype=np.float32)
+            assert isinstance(c.pixels, np.memmap)
+            self.assertEqual(c.pixels.shape, (3, 5, 3))
+            self.assertEqual(c.pixels.dtype, np.float32)
+            c.write_pixel(2, 1, Color(1, 0.5, 0))
+            c.flush()
+            reopened = MemmapCanvas.open(path)
+            self.assertEqual((reopened.width, reopened.height), (5, 3))
+            self.assertEqual(reopened.pixel_at(2, 1), Color(1, 0.5, 0))
+            self.assertEqual(reopened.to_ppm(), c.to_ppm())
+            c.close()
+            reopened.close()
+            assert os.path.exists(path)
+
+    def test_opened_memmap_canvas_leaves_file_alone_unless_writable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "canvas.npy")
+            MemmapCanvas(2, 2, path).close()
+            c = MemmapCanvas.open(path)
+            c.write_pixel(0, 0, Color(1, 1, 1))
+            self.assertEqual(c.pixel_at(0, 0), Color(1, 1, 1))
+            c.close()
+            self.assertEqual(MemmapCanvas.open(path).pixel_at(0, 0), Color(0, 0, 0))
+            c = MemmapCanvas.open(path, writable=True)
+            c.write_pixel(0, 0, Color(1, 1, 1))
+            c.close()
+            self.assertEqual(MemmapCanvas.open(path).pixel_at(0, 0), Color(1, 1, 1))
+
+    def test_temporary_memmap_canvas_is_deleted_on_close(self):
+        c = MemmapCanvas(4, 4)
+        assert os.path.exists(c.path)
+        c.close()
+        assert not os.path.exists(c.path)
+
+    def test_memmap_canvas_encoders_stream_in_chunks(self):
+        c = MemmapCanvas(512, 512)
+        c.pixels[:] = 0.5
+        expected = Canvas(512, 512)
+        expected.pixels[:] = 0.5
+        self.assertEqual(c.to_p6(), expected.to_p6())
+        image_bytes = c.pixels.nbytes
+        tracemalloc.start()
+        try:
+            with open(os.devnull, "wb") as f:
+                c.write_p6(f, rows_per_chunk=16)
+                c.write_png(f, rows_per_chunk=16)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            c.close()
+        self.assertLess(peak, image_bytes // 8)
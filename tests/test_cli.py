@@ -0,0 +1,81 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from raytracer.cli import main, parse_size
+from tests.test_scene import DEFAULT_SCENE
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.scene = os.path.join(self.directory.name, "scene.json")
+        with open(self.scene, "w") as f:
+            json.dump(DEFAULT_SCENE, f)
+
+    def run_cli(self, *argv: str) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(list(argv)), 0)
+        return out.getvalue()
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size("64"), (64, 64))
+        self.assertEqual(parse_size("640x480"), (640, 480))
+
+    def test_render_scene_at_camera_size(self):
+        output = os.path.join(self.directory.name, "out.ppm")
+        self.run_cli("render", self.scene, "--format", "ppm", "--output", output)
+        with open(output) as f:
+            self.assertEqual(f.read().splitlines()[:2], ["P3", "11 11"])
+
+    def test_render_several_sizes_from_one_scene(self):
+        output = os.path.join(self.directory.name, "out-{width}x{height}.png")
+        printed = self.run_cli(
+            "render", self.scene, "--size", "8", "--size", "12x6", "--output", output
+        )
+        for width, height in ((8, 8), (12, 6)):
+            path = output.format(width=width, height=height)
+            self.assertIn(path, printed)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_default_output_is_named_after_scene(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            self.run_cli("render", self.scene, "--size", "4", "--format", "p6")
+            assert os.path.exists("scene.ppm")
+        finally:
+            os.chdir(cwd)
+
+    def test_stats_are_printed_as_json(self):
+        output = os.path.join(self.directory.name, "out.png")
+        printed = self.run_cli("render", self.scene, "--output", output, "--stats")
+        report = json.loads(printed[printed.index("{") :])
+        self.assertEqual(report["counters"]["rays"], 121)
+
+    def test_path_selects_batch_or_bvh_rendering(self):
+        output = os.path.join(self.directory.name, "out.ppm")
+        images = []
+        for path in ("batch", "bvh"):
+            printed = self.run_cli(
+                "render",
+                self.scene,
+                "--format",
+                "ppm",
+                "--output",
+                output,
+                "--path",
+                path,
+                "--stats",
+            )
+            report = json.loads(printed[printed.index("{") :])
+            self.assertEqual("packets" in report["counters"], path == "batch")
+            with open(output) as f:
+                images.append(f.read())
+        self.assertEqual(images[0], images[1])
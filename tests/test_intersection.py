@@ -1,6 +1,6 @@
 import unittest
 
-from raytracer.intersection import Intersection, hit
+from raytracer.intersection import Intersection, IntersectionBuffer, hit
 from raytracer.sphere import Sphere
 
 
@@ -53,3 +53,44 @@ class TestIntersection(unittest.TestCase):
         xs = [i1, i2, i3, i4]
         i = hit(xs)
         self.assertEqual(i, i4)
+
+    def test_hit_prefers_first_of_equal_intersections(self):
+        s = Sphere()
+        i1 = Intersection(2, s)
+        i2 = Intersection(2, s)
+        self.assertIs(hit([i1, i2]), i1)
+
+
+class TestIntersectionBuffer(unittest.TestCase):
+    def test_buffer_starts_empty(self):
+        buffer = IntersectionBuffer()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.nearest(), -1)
+
+    def test_nearest_is_lowest_nonnegative_t(self):
+        buffer = IntersectionBuffer()
+        for t, object_id in [(5, 0), (7, 0), (-3, 1), (2, 1)]:
+            buffer.append(t, object_id)
+        i = buffer.nearest()
+        self.assertEqual(buffer.t[i], 2)
+        self.assertEqual(buffer.object_ids[i], 1)
+        self.assertEqual(buffer.t[buffer.nearest(t_min=3)], 5)
+
+    def test_nearest_when_all_t_are_negative(self):
+        buffer = IntersectionBuffer()
+        buffer.append(-2, 0)
+        buffer.append(-1, 0)
+        self.assertEqual(buffer.nearest(), -1)
+
+    def test_buffer_grows_and_is_reused(self):
+        buffer = IntersectionBuffer(capacity=2)
+        for i in range(5):
+            buffer.append(float(i), i)
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(list(buffer.object_ids[:5]), [0, 1, 2, 3, 4])
+        capacity = len(buffer.t)
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        buffer.append(1.0, 9)
+        self.assertEqual(len(buffer.t), capacity)
+        self.assertEqual(buffer.object_ids[buffer.nearest()], 9)
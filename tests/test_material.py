@@ -1,10 +1,12 @@
 from math import sqrt
 import unittest
 
+import numpy as np
+
 from raytracer.light import Light
 from raytracer.material import Material
 from raytracer.sphere import Sphere
-from raytracer.tuple import Color, Point, Vector
+from raytracer.tuple import EPSILON, Color, Point, Vector
 
 
 class TestMaterial(unittest.TestCase):
@@ -68,3 +70,64 @@ class TestMaterial(unittest.TestCase):
         print("Expected:", Color(1.0, 1.0, 1.0))
         print("Actual:", result)
         self.assertEqual(result, Color(0.1, 0.1, 0.1))
+
+    def test_lighting_with_surface_in_shadow(self):
+        m = Material()
+        position = Point(0, 0, 0)
+        eyev = Vector(0, 0, -1)
+        normalv = Vector(0, 0, -1)
+        light = Light(Point(0, 0, -10), Color(1, 1, 1))
+        result = m.lighting(light, position, eyev, normalv, True)
+        self.assertEqual(result, Color(0.1, 0.1, 0.1))
+        colors = m.lighting_batch(
+            light,
+            np.zeros((2, 3)),
+            np.array([[0, 0, -1.0]] * 2),
+            np.array([[0, 0, -1.0]] * 2),
+            np.array([True, False]),
+        )
+        self.assertEqual(Color(*colors[0]), Color(0.1, 0.1, 0.1))
+        self.assertEqual(Color(*colors[1]), Color(1.9, 1.9, 1.9))
+
+    def test_batch_lighting_matches_scalar_lighting(self):
+        m = Material()
+        m.color = Color(1, 0.2, 0.6)
+        m.shininess = 50
+        light = Light(Point(-10, 10, -10), Color(1, 0.9, 0.8))
+        rng = np.random.default_rng(2)
+        points = rng.uniform(-1, 1, (300, 3))
+        normals = rng.normal(size=(300, 3))
+        normals /= np.linalg.norm(normals, axis=1)[:, None]
+        eyevs = rng.normal(size=(300, 3))
+        eyevs /= np.linalg.norm(eyevs, axis=1)[:, None]
+        colors = m.lighting_batch(light, points, eyevs, normals)
+        self.assertEqual(colors.shape, (300, 3))
+        for point, eyev, normalv, color in zip(points, eyevs, normals, colors):
+            expected = m.lighting(light, Point(*point), Vector(*eyev), Vector(*normalv))
+            self.assertEqual(Color(*color), expected)
+
+    def test_batch_lighting_covers_all_branches(self):
+        m = Material()
+        points = np.zeros((4, 3))
+        eyevs = np.array(
+            [
+                [0, 0, -1],
+                [0, sqrt(2) / 2, -sqrt(2) / 2],
+                [0, -sqrt(2) / 2, -sqrt(2) / 2],
+                [0, 0, -1],
+            ]
+        )
+        normals = np.tile([0.0, 0.0, -1.0], (4, 1))
+        expected = [1.9, 1.0, 1.6364, 0.1]
+        lights = [
+            Point(0, 0, -10),
+            Point(0, 0, -10),
+            Point(0, 10, -10),
+            Point(0, 0, 10),
+        ]
+        for i, (position, value) in enumerate(zip(lights, expected)):
+            light = Light(position, Color(1, 1, 1))
+            color = m.lighting_batch(
+                light, points[i : i + 1], eyevs[i : i + 1], normals[i : i + 1]
+            )
+            self.assertTrue(np.allclose(color, value, atol=1e-4))
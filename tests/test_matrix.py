@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from raytracer.matrix import Matrix
 from raytracer.tuple import Tuple, nearly_equal
 
@@ -273,3 +275,50 @@ class TestMatrix(unittest.TestCase):
         )
         C = A * B
         assert C * B.inverse() == A
+
+    def test_inverting_noninvertible_matrix_raises(self):
+        A = Matrix([[-4, 2, -2, -3], [9, 6, 2, 6], [0, -5, 1, -5], [0, 0, 0, 0]])
+        with self.assertRaises(ValueError):
+            A.inverse()
+        B = Matrix([[1, 2, 3, 0], [2, 4, 6, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+        assert B.is_affine()
+        with self.assertRaises(ValueError):
+            B.inverse()
+
+    def test_affine_matrix(self):
+        assert self.identity_matrix.is_affine()
+        assert Matrix(
+            [[1, 2, 3, 4], [5, 6, 7, 8], [9, 8, 7, 6], [0, 0, 0, 1]]
+        ).is_affine()
+        assert not Matrix(
+            [[1, 2, 3, 4], [5, 6, 7, 8], [9, 8, 7, 6], [5, 4, 3, 2]]
+        ).is_affine()
+        assert not Matrix([[1, 0], [0, 1]]).is_affine()
+        rows = [(1.0, 0.0, 0.0, 2.0), (0, 1, 0, 3), (0, 0, 1, 4), (0.0, 0.0, 0.0, 1.0)]
+        assert Matrix(rows).is_affine()
+        assert Matrix(np.array(rows)).is_affine()
+        assert not Matrix(np.eye(4)[::-1]).is_affine()
+
+    def test_inverse_of_affine_matrix(self):
+        A = Matrix([[2, 1, 0, 3], [0, 3, -1, -2], [1, 0, 4, 5], [0, 0, 0, 1]])
+        assert A * A.inverse() == self.identity_matrix
+        assert A.inverse() == Matrix(np.linalg.inv(A.grid).tolist())
+
+    def test_4x4_determinant_and_inverse_match_numpy(self):
+        rng = np.random.default_rng(42)
+        for _ in range(20):
+            grid = rng.uniform(-10, 10, (4, 4)).tolist()
+            A = Matrix(grid)
+            self.assertAlmostEqual(A.determinant(), np.linalg.det(grid), places=6)
+            assert A.inverse() == Matrix(np.linalg.inv(grid).tolist())
+
+    def test_inverse_of_3x3_matrix(self):
+        A = Matrix([[1, 2, 6], [-5, 8, -4], [2, 6, 4]])
+        assert A.inverse() == Matrix(np.linalg.inv(A.grid).tolist())
+
+    def test_affine_form_of_4x4_matrix(self):
+        A = Matrix([[1, 2, 3, 4], [5, 6, 7, 8], [9, 8, 7, 6], [0, 0, 0, 1]])
+        assert A.affine() == (1, 2, 3, 4, 5, 6, 7, 8, 9, 8, 7, 6)
+        assert A.affine() is A.affine()
+        with self.assertRaises(ValueError):
+            Matrix([[1, 0], [0, 1]]).affine()
@@ -0,0 +1,104 @@
+from math import pi
+import unittest
+
+import numpy as np
+
+from raytracer import stats
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas
+from raytracer.packet import Packets, world_spheres
+from raytracer.render import render
+from raytracer.sphere import Sphere
+from raytracer.transformation import rotation_z, scaling, translation, view_transform
+from raytracer.tuple import Point, Vector
+from raytracer.world import World
+from tests.test_bvh import random_spheres
+from tests.test_world import default_world
+
+
+def camera(width: int, height: int) -> Camera:
+    c = Camera(width, height, pi / 2)
+    c.transform = view_transform(Point(0, 0, -8), Point(0, 0, 0), Vector(0, 1, 0))
+    return c
+
+
+class TestPacket(unittest.TestCase):
+    def test_packets_split_grid_into_blocks(self):
+        origins, directions = camera(13, 10).rays_for_rows(0, 10)
+        packets = Packets(origins, directions, 10, 13)
+        self.assertEqual(len(packets), 4)
+        self.assertEqual(packets.row_sizes.tolist(), [8, 2])
+        self.assertEqual(packets.column_sizes.tolist(), [8, 5])
+        rays = packets.rays(np.array([False, True, False, False])).reshape(10, 13)
+        self.assertEqual(rays.sum(), 8 * 5)
+        assert rays[:8, 8:].all()
+
+    def test_packet_cones_contain_their_rays(self):
+        origins, directions = camera(16, 16).rays_for_rows(0, 16)
+        packets = Packets(origins, directions, 16, 16)
+        assert np.allclose(packets.apex, (0, 0, -8))
+        self.assertEqual(packets.spread, 0)
+        for index in range(len(packets)):
+            rays = packets.rays(np.arange(len(packets)) == index)
+            cosines = directions[rays] @ packets.axis[index]
+            assert (
+                np.arccos(np.minimum(cosines, 1)) <= packets.half_angle[index]
+            ).all()
+
+    def test_packets_miss_spheres_outside_their_cone(self):
+        origins, directions = camera(16, 16).rays_for_rows(0, 16)
+        packets = Packets(origins, directions, 16, 16)
+        visible = packets.visible(np.array([[6.0, 6, 0], [0, 0, 0]]), np.ones(2))
+        # only the top right packet of the four reaches it
+        self.assertEqual(visible[:, 0].tolist(), [False, True, False, False])
+        assert visible[:, 1].all()
+        behind = packets.visible(np.array([[0.0, 0, -12]]), np.ones(1))
+        assert not behind.any()
+
+    def test_world_spheres_enclose_transformed_spheres(self):
+        s = Sphere()
+        s.transform = translation(1, 2, 3) * rotation_z(0.5) * scaling(1, 3, 1)
+        centers, radii = world_spheres([s, Sphere()])
+        assert np.allclose(centers, [(1, 2, 3), (0, 0, 0)])
+        assert np.allclose(radii, [3, 1])
+
+    def test_world_spheres_do_not_build_the_bvh(self):
+        w = default_world()
+        centers, _ = w.spheres
+        assert np.allclose(centers, 0)
+        self.assertIsNone(w._bvh)
+        w.objects[0].transform = translation(1, 2, 3)
+        centers, _ = w.spheres
+        assert np.allclose(centers[0], (1, 2, 3))
+        self.assertIsNone(w._bvh)
+
+    def test_packets_find_same_hits_as_every_ray(self):
+        w = World()
+        w.objects.extend(random_spheres(30))
+        origins, directions = camera(37, 29).rays_for_rows(0, 29)
+        expected = w.intersect_batch(origins, directions)
+        packets = Packets(origins, directions, 29, 37)
+        actual = w.intersect_batch(origins, directions, packets)
+        assert np.array_equal(actual[1], expected[1])
+        assert np.allclose(actual[0], expected[0])
+
+    def test_packets_skip_intersections_with_background(self):
+        w = default_world()
+        for s in w.objects:
+            s.transform = translation(3, 3, 0) * s.transform
+        w.invalidate()
+        with stats.collect() as collector:
+            render(w, camera(32, 32), Canvas(32, 32), batch=True)
+        counters = collector.counters
+        self.assertEqual(counters["packets"], 16)
+        assert counters["culled_packet_tests"] > counters["packet_tests"] / 2
+        assert counters["intersection_tests"] < 32 * 32 * 2 / 2
+
+    def test_packet_render_matches_scalar_render(self):
+        w = World()
+        w.objects.extend(random_spheres(20))
+        w.lights = default_world().lights
+        c = camera(24, 20)
+        scalar = render(w, c, Canvas(24, 20), tile=7)
+        batch = render(w, c, Canvas(24, 20), tile=7, batch=True)
+        assert np.allclose(batch.pixels, scalar.pixels)
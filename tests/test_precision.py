@@ -0,0 +1,101 @@
+from math import pi
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from raytracer import precision
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas, MemmapCanvas, quantize
+from raytracer.light import Light
+from raytracer.render import render, render_antialiased
+from raytracer.sphere import Sphere
+from raytracer.transformation import scaling, translation, view_transform
+from raytracer.tuple import EPSILON, Color, Point, Vector
+from raytracer.world import World
+from tests.test_stats import camera
+from tests.test_world import default_world
+
+
+def shadowed_floor() -> World:
+    # a ball casting a shadow onto the top of a sphere of radius 1000: the
+    # lit floor lies 1000 units from the floor sphere's center, where float32
+    # rounds intersections by far more than EPSILON
+    floor = Sphere()
+    floor.transform = translation(0, -1000, 0) * scaling(1000, 1000, 1000)
+    ball = Sphere()
+    ball.transform = translation(0, 1, 0)
+    w = World()
+    w.objects.extend([floor, ball])
+    w.light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    return w
+
+
+class TestPrecision(unittest.TestCase):
+    def test_resolve(self):
+        self.assertEqual(precision.resolve(None), np.float64)
+        self.assertEqual(precision.resolve("float32"), np.float32)
+        self.assertEqual(precision.resolve(np.float32), np.float32)
+        with self.assertRaises(ValueError):
+            precision.resolve("float16")
+
+    def test_epsilon_depends_on_precision(self):
+        self.assertEqual(precision.epsilon("float64"), EPSILON)
+        assert precision.epsilon("float32") > EPSILON
+
+    def test_using_changes_default_temporarily(self):
+        with precision.using("float32") as dtype:
+            self.assertEqual(dtype, np.float32)
+            self.assertEqual(Canvas(2, 2).pixels.dtype, np.float32)
+        self.assertEqual(Canvas(2, 2).pixels.dtype, np.float64)
+
+    def test_canvas_dtype(self):
+        self.assertEqual(Canvas(2, 2, dtype="float32").pixels.dtype, np.float32)
+        c = MemmapCanvas(2, 2, dtype="float32")
+        self.assertEqual(c.pixels.dtype, np.float32)
+        c.close()
+
+    def test_rays_are_generated_at_precision(self):
+        origins, directions = camera(4).rays_for_rows(0, 4, precision="float32")
+        self.assertEqual(origins.dtype, np.float32)
+        self.assertEqual(directions.dtype, np.float32)
+
+    def test_batch_shading_stays_in_float32(self):
+        w = default_world()
+        origins, directions = camera(8).rays_for_rows(0, 8, precision="float32")
+        self.assertEqual(w.color_at_batch(origins, directions).dtype, np.float32)
+
+    def test_float32_render_matches_float64(self):
+        w = default_world()
+        c = camera(32)
+        expected = render(w, c, Canvas(32, 32), batch=True)
+        actual = render(
+            w, c, Canvas(32, 32, dtype="float32"), batch=True, precision="float32"
+        )
+        difference = quantize(actual.pixels).astype(int) - quantize(expected.pixels)
+        assert np.abs(difference).max() <= 1
+
+    def test_float32_offset_keeps_shadow_acne_off_far_surfaces(self):
+        w = shadowed_floor()
+        c = Camera(32, 32, pi / 3)
+        c.transform = view_transform(Point(0, 3, -6), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = quantize(render(w, c, Canvas(32, 32), batch=True).pixels)
+
+        def deviation() -> np.ndarray:
+            canvas = Canvas(32, 32, dtype="float32")
+            actual = render(w, c, canvas, batch=True, precision="float32")
+            difference = quantize(actual.pixels).astype(int) - expected
+            return np.abs(difference).max(axis=2)
+
+        self.assertLessEqual(deviation().max(), 1)
+        with mock.patch.dict(precision.EPSILONS, {np.dtype(np.float32): EPSILON}):
+            # lit floor pixels shadowing themselves
+            self.assertGreater((deviation() > 8).sum(), 32 * 32 // 4)
+
+    def test_float32_antialiased_render_matches_float64(self):
+        w = default_world()
+        c = camera(16)
+        expected, actual = Canvas(16, 16), Canvas(16, 16, dtype="float32")
+        render_antialiased(w, c, expected, batch=True)
+        render_antialiased(w, c, actual, batch=True, precision="float32")
+        assert np.allclose(actual.pixels, expected.pixels, atol=0.05)
@@ -1,7 +1,7 @@
 import unittest
 
 from raytracer.ray import Ray
-from raytracer.transformation import translation
+from raytracer.transformation import rotation_x, scaling, translation
 from raytracer.tuple import Point, Vector
 
 
@@ -32,3 +32,27 @@ class TestRay(unittest.TestCase):
         self.assertEqual(r2.origin, Point(2, 6, 12))
         print(r2.direction)
         self.assertEqual(r2.direction, Vector(0, 3, 0))
+
+    def test_translating_ray_without_modifying_it(self):
+        r = Ray(Point(1, 2, 3), Vector(0, 1, 0))
+        r2 = r.transformed(translation(3, 4, 5))
+        self.assertEqual(r2.origin, Point(4, 6, 8))
+        self.assertEqual(r2.direction, Vector(0, 1, 0))
+        self.assertEqual(r.origin, Point(1, 2, 3))
+        self.assertEqual(r.direction, Vector(0, 1, 0))
+
+    def test_scaling_ray_without_modifying_it(self):
+        r = Ray(Point(1, 2, 3), Vector(0, 1, 0))
+        r2 = r.transformed(scaling(2, 3, 4))
+        self.assertEqual(r2.origin, Point(2, 6, 12))
+        self.assertEqual(r2.direction, Vector(0, 3, 0))
+        self.assertIsInstance(r2.origin, Point)
+        self.assertIsInstance(r2.direction, Vector)
+
+    def test_transformed_matches_transform(self):
+        m = translation(1, -2, 3) * rotation_x(0.3) * scaling(2, 1, 0.5)
+        r = Ray(Point(1, 2, 3), Vector(0.2, 1, -0.4))
+        r2 = r.transformed(m)
+        r3 = Ray(r.origin, r.direction).transform(m)
+        self.assertEqual(r2.origin, r3.origin)
+        self.assertEqual(r2.direction, r3.direction)
@@ -0,0 +1,151 @@
+from math import pi
+import unittest
+
+import numpy as np
+
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas, MemmapCanvas
+from raytracer.render import (
+    render,
+    render_antialiased,
+    render_progressive,
+    sample_offsets,
+    tiles,
+)
+from raytracer.world import World
+from raytracer.transformation import view_transform
+from raytracer.tuple import EPSILON, Color, Point, Vector
+from tests.test_world import default_world
+
+
+class TestRender(unittest.TestCase):
+    def test_tiles_cover_image_once(self):
+        covered = np.zeros((5, 7), dtype=int)
+        for x0, y0, x1, y1 in tiles(7, 5, 3):
+            covered[y0:y1, x0:x1] += 1
+        self.assertTrue((covered == 1).all())
+
+    def test_rendering_world_with_camera(self):
+        w = default_world()
+        c = Camera(11, 11, pi / 2)
+        c.transform = view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        image = render(w, c, Canvas(11, 11))
+        self.assertEqual(image.pixel_at(5, 5), Color(0.38066, 0.47583, 0.2855))
+
+    def test_canvas_must_match_camera(self):
+        with self.assertRaises(ValueError):
+            render(default_world(), Camera(11, 11, pi / 2), Canvas(10, 11))
+
+    def test_parallel_render_matches_serial_render(self):
+        w = default_world()
+        c = Camera(24, 18, pi / 3)
+        c.transform = view_transform(Point(0, 1, -4), Point(0, 0, 0), Vector(0, 1, 0))
+        serial = render(w, c, Canvas(24, 18), tile=5)
+        parallel = render(w, c, Canvas(24, 18), workers=2, tile=5)
+        self.assertTrue(np.array_equal(serial.pixels, parallel.pixels))
+
+    def test_batch_render_matches_scalar_render(self):
+        w = default_world()
+        c = Camera(24, 18, pi / 3)
+        c.transform = view_transform(Point(0, 1, -4), Point(0, 0, 0), Vector(0, 1, 0))
+        scalar = render(w, c, Canvas(24, 18), tile=5)
+        batch = render(w, c, Canvas(24, 18), tile=5, batch=True)
+        self.assertLess(np.abs(scalar.pixels - batch.pixels).max(), EPSILON)
+        parallel = render(w, c, Canvas(24, 18), workers=2, tile=5, batch=True)
+        self.assertTrue(np.array_equal(batch.pixels, parallel.pixels))
+
+    def test_progressive_render_matches_render(self):
+        w = default_world()
+        c = Camera(27, 19, pi / 3)
+        c.transform = view_transform(Point(0, 1, -4), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = render(w, c, Canvas(27, 19), batch=True)
+        canvas = Canvas(27, 19)
+        passes = list(render_progressive(w, c, canvas, step=8, band=5, batch=True))
+        self.assertEqual([p[0] for p in passes[::3]], [8, 4, 2, 1])
+        self.assertEqual(passes[:3], [(8, 0, 8), (8, 8, 16), (8, 16, 19)])
+        self.assertTrue(np.array_equal(canvas.pixels, expected.pixels))
+
+    def test_progressive_coarse_pass_is_upscaled_preview(self):
+        w = default_world()
+        c = Camera(16, 16, pi / 3)
+        c.transform = view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = render(w, c, Canvas(16, 16))
+        canvas = Canvas(16, 16)
+        self.assertEqual(next(render_progressive(w, c, canvas)), (8, 0, 16))
+        for y in range(16):
+            for x in range(16):
+                sample = expected.pixels[y // 8 * 8, x // 8 * 8]
+                self.assertTrue(np.array_equal(canvas.pixels[y, x], sample))
+
+    def test_progressive_step_must_be_power_of_two(self):
+        with self.assertRaises(ValueError):
+            next(render_progressive(default_world(), Camera(8, 8, 1), Canvas(8, 8), 6))
+
+    def test_sample_offsets_spread_over_pixel(self):
+        offsets = sample_offsets(16)
+        assert ((offsets > 0) & (offsets < 1)).all()
+        self.assertEqual(len(np.unique(offsets, axis=0)), 16)
+        self.assertLess(np.abs(offsets.mean(axis=0) - 0.5).max(), 0.05)
+
+    def test_antialiasing_flat_image_uses_initial_samples(self):
+        c = Camera(8, 8, pi / 3)
+        spp = render_antialiased(World(), c, Canvas(8, 8), samples=4, max_samples=16)
+        self.assertEqual(spp, 4)
+
+    def test_antialiasing_refines_edges_only(self):
+        w = default_world()
+        c = Camera(24, 24, pi / 3)
+        c.transform = view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        adaptive = Canvas(24, 24)
+        spp = render_antialiased(w, c, adaptive, 4, 16, batch=True)
+        assert 4 < spp < 16
+        reference = Canvas(24, 24)
+        self.assertEqual(render_antialiased(w, c, reference, 16, 16, batch=True), 16)
+        error = np.abs(adaptive.pixels - reference.pixels).max(axis=2)
+        self.assertLess(np.median(error), EPSILON)
+        self.assertLess(error.max(), 0.1)
+
+    def test_antialiasing_batch_matches_scalar(self):
+        w = default_world()
+        c = Camera(12, 10, pi / 3)
+        c.transform = view_transform(Point(0, 1, -4), Point(0, 0, 0), Vector(0, 1, 0))
+        scalar, batch = Canvas(12, 10), Canvas(12, 10)
+        spp = render_antialiased(w, c, scalar, 2, 8, chunk=16)
+        self.assertEqual(render_antialiased(w, c, batch, 2, 8, batch=True), spp)
+        self.assertLess(np.abs(scalar.pixels - batch.pixels).max(), EPSILON)
+
+    def test_antialiasing_checks_sample_counts(self):
+        with self.assertRaises(ValueError):
+            render_antialiased(World(), Camera(4, 4, 1), Canvas(4, 4), 8, 4)
+
+    def test_render_into_memmap_canvas_in_place(self):
+        w = default_world()
+        c = Camera(24, 18, pi / 3)
+        c.transform = view_transform(Point(0, 1, -4), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = render(w, c, Canvas(24, 18), tile=5, batch=True)
+        for workers in (1, 2):
+            canvas = MemmapCanvas(24, 18)
+            pixels = canvas.pixels
+            try:
+                result = render(w, c, canvas, workers=workers, tile=5, batch=True)
+                assert result.pixels is pixels
+                self.assertTrue(np.array_equal(pixels, expected.pixels))
+                reread = np.load(canvas.path)
+                self.assertTrue(np.array_equal(reread, expected.pixels))
+            finally:
+                canvas.close()
+
+    def test_parallel_render_into_opened_memmap_canvas_keeps_file(self):
+        w = default_world()
+        c = Camera(12, 9, pi / 3)
+        c.transform = view_transform(Point(0, 1, -4), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = render(w, c, Canvas(12, 9), batch=True)
+        blank = MemmapCanvas(12, 9)
+        try:
+            canvas = MemmapCanvas.open(blank.path)
+            render(w, c, canvas, workers=2, tile=5, batch=True)
+            self.assertTrue(np.array_equal(canvas.pixels, expected.pixels))
+            self.assertFalse(np.load(blank.path).any())
+            canvas.close()
+        finally:
+            blank.close()
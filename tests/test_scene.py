@@ -0,0 +1,115 @@
+from math import pi
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas
+from raytracer.matrix import Matrix
+from raytracer.render import render
+from raytracer.scene import BATCH_MAX_OBJECTS, load_scene, load_scene_file
+from raytracer.sphere import Sphere
+from raytracer.transformation import view_transform
+from raytracer.tuple import Color, Point, Vector
+from tests.test_world import default_world
+
+DEFAULT_SCENE = {
+    "camera": {
+        "width": 11,
+        "height": 11,
+        "field_of_view": pi / 2,
+        "from": [0, 0, -5],
+        "to": [0, 0, 0],
+        "up": [0, 1, 0],
+    },
+    "lights": [{"position": [-10, 10, -10], "intensity": [1, 1, 1]}],
+    "objects": [
+        {
+            "type": "sphere",
+            "material": {
+                "color": [0.8, 1.0, 0.6],
+                "diffuse": 0.7,
+                "specular": 0.2,
+            },
+        },
+        {"type": "sphere", "transform": [["scale", 0.5, 0.5, 0.5]]},
+    ],
+}
+
+
+class TestScene(unittest.TestCase):
+    def test_loading_scene_matches_hand_built_world(self):
+        scene = load_scene(DEFAULT_SCENE)
+        w = default_world()
+        self.assertEqual(len(scene.world.objects), 2)
+        for loaded, expected in zip(scene.world.objects, w.objects):
+            assert isinstance(loaded, Sphere)
+            self.assertEqual(loaded.transform, expected.transform)
+            self.assertEqual(loaded.material, expected.material)
+        self.assertEqual(scene.world.light.position, w.light.position)
+        self.assertEqual(scene.world.light.intensity, w.light.intensity)
+        self.assertEqual(
+            scene.camera.transform,
+            view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0)),
+        )
+        image = scene.render()
+        self.assertEqual(image.pixel_at(5, 5), Color(0.38066, 0.47583, 0.2855))
+
+    def test_loading_from_json_text_and_file(self):
+        text = json.dumps(DEFAULT_SCENE)
+        self.assertEqual(len(load_scene(text).world.objects), 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scene.json")
+            with open(path, "w") as f:
+                f.write(text)
+            self.assertEqual(len(load_scene_file(path).world.objects), 2)
+
+    def test_transforms_apply_in_listed_order(self):
+        description = dict(DEFAULT_SCENE)
+        description["objects"] = [
+            {
+                "transform": [
+                    ["rotate_x", pi / 2],
+                    ["scale", 5, 5, 5],
+                    ["translate", 10, 5, 7],
+                ]
+            }
+        ]
+        shape = load_scene(description).world.objects[0]
+        expected = Matrix.identity().rotate_x(pi / 2).scale(5, 5, 5).translate(10, 5, 7)
+        self.assertEqual(shape.transform, expected)
+        self.assertEqual(shape.inverse, expected.inverse())
+
+    def test_invalid_descriptions_are_rejected(self):
+        for objects in (
+            [{"type": "cube"}],
+            [{"transform": [["spin", 1]]}],
+            [{"transform": [["translate", 1, 2]]}],
+            [{"material": {"roughness": 0.5}}],
+        ):
+            with self.assertRaises(ValueError):
+                load_scene(dict(DEFAULT_SCENE, objects=objects))
+
+    def test_large_scenes_default_to_the_bvh_path(self):
+        assert load_scene(DEFAULT_SCENE).batch
+        description = dict(
+            DEFAULT_SCENE, objects=[{"type": "sphere"}] * (BATCH_MAX_OBJECTS + 1)
+        )
+        assert not load_scene(description).batch
+
+    def test_scene_is_compiled_once_for_many_sizes(self):
+        scene = load_scene(DEFAULT_SCENE)
+        spheres = scene.world.spheres
+        small = scene.render((8, 6), batch=True)
+        self.assertEqual((small.width, small.height), (8, 6))
+        assert scene.camera_for(8, 6) is scene.camera_for(8, 6)
+        assert scene.world.spheres is spheres
+        # the batched path never needs the BVH
+        self.assertIsNone(scene.world._bvh)
+        c = Camera(8, 6, pi / 2)
+        c.transform = scene.camera.transform
+        expected = render(default_world(), c, Canvas(8, 6), batch=True)
+        self.assertTrue(np.array_equal(small.pixels, expected.pixels))
@@ -0,0 +1,195 @@
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from raytracer import server
+from raytracer.canvas import quantize
+from raytracer.scene import load_scene
+from raytracer.server import JobServer, SceneNotCached, render_job_tile, scene_digest
+from tests.test_scene import DEFAULT_SCENE
+
+
+async def run_jobs(server: JobServer, path: str, requests):
+    # sends every request over one connection and collects the replies
+    # until each job has finished
+    reader, writer = await asyncio.open_unix_connection(path)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    replies = []
+    finished = 0
+    while finished < len(requests):
+        reply = json.loads(await reader.readline())
+        replies.append(reply)
+        finished += reply["event"] in ("done", "error")
+    writer.close()
+    await writer.wait_closed()
+    return replies
+
+
+class TestServer(unittest.TestCase):
+    def serve(self, requests, **options):
+        async def main():
+            server = JobServer(workers=1, **options)
+            await server.start()
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "server.sock")
+                unix_server = await asyncio.start_unix_server(server.handle, path)
+                try:
+                    async with unix_server:
+                        return await asyncio.wait_for(
+                            run_jobs(server, path, requests), 60
+                        )
+                finally:
+                    await server.close()
+
+        return asyncio.run(main())
+
+    def test_tiles_assemble_into_rendered_image(self):
+        replies = self.serve(
+            [{"id": "a", "scene": DEFAULT_SCENE, "size": [13, 9], "tile": 4}]
+        )
+        expected = quantize(load_scene(DEFAULT_SCENE).render((13, 9)).pixels)
+        image = np.zeros_like(expected)
+        tile_replies = [reply for reply in replies if reply["event"] == "tile"]
+        self.assertEqual(len(tile_replies), 12)
+        for reply in tile_replies:
+            x0, y0, x1, y1 = reply["tile"]
+            block = np.frombuffer(base64.b64decode(reply["rgb"]), dtype=np.uint8)
+            image[y0:y1, x0:x1] = block.reshape(y1 - y0, x1 - x0, 3)
+        self.assertTrue(np.array_equal(image, expected))
+        self.assertEqual(replies[-1]["event"], "done")
+        self.assertEqual(replies[-1]["tiles"], 12)
+
+    def test_jobs_beyond_the_cap_wait_their_turn(self):
+        requests = [
+            {"id": job, "scene": DEFAULT_SCENE, "size": [8, 8], "tile": 2}
+            for job in ("a", "b", "c")
+        ]
+        replies = self.serve(requests, max_jobs=1, queue_size=1)
+        order = [reply["id"] for reply in replies]
+        self.assertEqual(order, ["a"] * 17 + ["b"] * 17 + ["c"] * 17)
+
+    def test_bad_requests_are_reported_and_do_not_stop_the_server(self):
+        bad_scene = dict(DEFAULT_SCENE, objects=[{"type": "cube"}])
+        replies = self.serve(
+            [
+                {"id": "bad", "scene": bad_scene},
+                {"id": "good", "scene": DEFAULT_SCENE, "size": [4, 4]},
+            ],
+            max_jobs=1,
+        )
+        self.assertEqual(replies[0]["id"], "bad")
+        self.assertEqual(replies[0]["event"], "error")
+        self.assertIn("cube", replies[0]["message"])
+        self.assertEqual(replies[-1], {**replies[-1], "id": "good", "event": "done"})
+
+    def test_requests_that_are_not_objects_are_rejected(self):
+        replies = self.serve(
+            [
+                ["not", "a", "job"],
+                "scene",
+                {"id": "good", "scene": DEFAULT_SCENE, "size": [4, 4]},
+            ],
+            max_jobs=1,
+        )
+        for reply in replies[:2]:
+            self.assertEqual(reply["id"], None)
+            self.assertEqual(reply["event"], "error")
+            self.assertIn("JSON object", reply["message"])
+        self.assertEqual(replies[-1], {**replies[-1], "id": "good", "event": "done"})
+
+    def test_scene_files_are_read_only_from_the_scene_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            scenes = os.path.join(directory, "scenes")
+            os.mkdir(scenes)
+            for path in (
+                os.path.join(scenes, "a.json"),
+                os.path.join(directory, "b.json"),
+            ):
+                with open(path, "w") as f:
+                    json.dump(DEFAULT_SCENE, f)
+            requests = [
+                {"id": "inside", "scene_file": "a.json", "size": [4, 4]},
+                {"id": "up", "scene_file": "../b.json", "size": [4, 4]},
+                {"id": "absolute", "scene_file": os.path.join(directory, "b.json")},
+            ]
+            replies = self.serve(requests, max_jobs=1, scene_dir=scenes)
+            disabled = self.serve(requests[:1])
+        events = {reply["id"]: reply for reply in replies if reply["event"] != "tile"}
+        self.assertEqual(events["inside"]["event"], "done")
+        for job in ("up", "absolute"):
+            self.assertEqual(events[job]["event"], "error")
+            self.assertIn("outside the scene directory", events[job]["message"])
+        self.assertEqual(disabled[-1]["event"], "error")
+        self.assertIn("does not read scene files", disabled[-1]["message"])
+
+    def test_tiles_name_their_scene_by_digest_once_compiled(self):
+        key = scene_digest(DEFAULT_SCENE)
+        server._scenes.pop(key, None)
+        tile = (0, 0, 4, 4)
+        with self.assertRaises(SceneNotCached):
+            render_job_tile(key, None, (8, 8), tile, None)
+        expected = render_job_tile(key, DEFAULT_SCENE, (8, 8), tile, None)
+        self.assertEqual(render_job_tile(key, None, (8, 8), tile, None), expected)
+        server._scenes.pop(key)
+
+    def test_jobs_with_many_more_tiles_than_workers_finish(self):
+        replies = self.serve(
+            [{"id": "a", "scene": DEFAULT_SCENE, "size": [10, 10], "tile": 1}]
+        )
+        tiles = {tuple(reply["tile"]) for reply in replies[:-1]}
+        self.assertEqual(len(tiles), 100)
+        self.assertEqual(replies[-1]["tiles"], 100)
+
+    def test_workers_keep_compiled_scenes_when_switching_between_them(self):
+        other = dict(DEFAULT_SCENE, objects=DEFAULT_SCENE["objects"][:1])
+        keys = [scene_digest(DEFAULT_SCENE), scene_digest(other)]
+        tile = (0, 0, 4, 4)
+        for key in keys:
+            server._scenes.pop(key, None)
+        render_job_tile(keys[0], DEFAULT_SCENE, (8, 8), tile, False)
+        render_job_tile(keys[0], None, (8, 8), tile, True)
+        world = server._scenes[keys[0]].world
+        bvh, spheres = world.bvh, world.spheres
+        # compiling another scene must not make this one rebuild its BVH
+        render_job_tile(keys[1], other, (8, 8), tile, False)
+        for key in keys * 2:
+            render_job_tile(key, None, (8, 8), tile, False)
+            render_job_tile(key, None, (8, 8), tile, True)
+        self.assertIs(world.bvh, bvh)
+        self.assertIs(world.spheres, spheres)
+        for key in keys:
+            server._scenes.pop(key)
+
+    def test_a_client_that_stops_reading_does_not_hold_up_others(self):
+        async def main():
+            server = JobServer(workers=1, max_jobs=1)
+            await server.start()
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "server.sock")
+                unix_server = await asyncio.start_unix_server(server.handle, path)
+                try:
+                    async with unix_server:
+                        # about 0.5 MB of tiles, more than the socket buffers
+                        # hold, that this client never reads
+                        _, stalled = await asyncio.open_unix_connection(path)
+                        big = {"id": "big", "scene": DEFAULT_SCENE, "size": [320, 320]}
+                        stalled.write(json.dumps(big).encode() + b"\n")
+                        await stalled.drain()
+                        small = {"id": "small", "scene": DEFAULT_SCENE, "size": [4, 4]}
+                        replies = await asyncio.wait_for(
+                            run_jobs(server, path, [small]), 60
+                        )
+                        stalled.close()
+                        return replies
+                finally:
+                    await server.close()
+
+        replies = asyncio.run(main())
+        self.assertEqual(replies[-1]["event"], "done")
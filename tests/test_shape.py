@@ -0,0 +1,18 @@
+import unittest
+
+from raytracer.bounds import Bounds
+from raytracer.shape import Shape
+
+
+class TestShape(unittest.TestCase):
+    def test_shape_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Shape()
+
+    def test_incomplete_subclass_fails_when_instantiated(self):
+        class Box(Shape):
+            def bounds(self) -> Bounds:
+                return Bounds((-1, -1, -1), (1, 1, 1))
+
+        with self.assertRaises(TypeError):
+            Box()
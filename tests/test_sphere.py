@@ -1,12 +1,14 @@
 from math import pi, sqrt
 import unittest
 
+import numpy as np
+
 from raytracer.material import Material
 from raytracer.matrix import Matrix
 from raytracer.ray import Ray
 from raytracer.sphere import Sphere
 from raytracer.transformation import rotation_z, scaling, translation
-from raytracer.tuple import Point, Vector
+from raytracer.tuple import EPSILON, Point, Vector
 
 
 class TestRay(unittest.TestCase):
@@ -126,3 +128,74 @@ class TestRay(unittest.TestCase):
         m.ambient = 1
         s.material = m
         self.assertEqual(s.material, m)
+
+    def test_sphere_caches_inverse_of_transformation(self):
+        s = Sphere()
+        t = scaling(2, 2, 2) * translation(1, 0, 0)
+        s.transform = t
+        self.assertEqual(s.inverse, t.inverse())
+        self.assertEqual(s.inverse_transpose, t.inverse().transpose())
+
+    def test_intersecting_and_normals_do_not_invert_per_ray(self):
+        s = Sphere()
+        s.transform = scaling(2, 2, 2)
+        inversions = Matrix.inversions
+        for _ in range(10):
+            xs = s.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+            s.normal_at(Point(0, 0, -2))
+        self.assertEqual(len(xs), 2)
+        self.assertEqual(Matrix.inversions, inversions)
+
+    def test_assigning_transformation_inverts_once(self):
+        s = Sphere()
+        inversions = Matrix.inversions
+        s.transform = translation(0, 1, 0)
+        self.assertEqual(Matrix.inversions, inversions + 1)
+
+    def test_batch_intersection_of_rays_with_sphere(self):
+        s = Sphere()
+        origins = np.array([[0, 0, -5], [0, 1, -5], [0, 2, -5], [0, 0, 0]])
+        directions = np.array([[0, 0, 1], [0, 0, 1], [0, 0, 1], [0, 0, 1]])
+        t0, t1, mask = s.intersect_batch(origins, directions)
+        self.assertEqual(mask.tolist(), [True, True, False, True])
+        self.assertEqual(t0[mask].tolist(), [4.0, 5.0, -1.0])
+        self.assertEqual(t1[mask].tolist(), [6.0, 5.0, 1.0])
+
+    def test_batch_intersection_accepts_homogeneous_rays(self):
+        s = Sphere()
+        s.transform = scaling(2, 2, 2)
+        t0, t1, mask = s.intersect_batch(
+            np.array([[0, 0, -5, 1]]), np.array([[0, 0, 1, 0]])
+        )
+        self.assertTrue(mask[0])
+        self.assertAlmostEqual(t0[0], 3)
+        self.assertAlmostEqual(t1[0], 7)
+
+    def test_batch_intersection_matches_scalar_intersection(self):
+        s = Sphere()
+        s.transform = translation(0.5, -0.25, 1) * scaling(1, 0.5, 2) * rotation_z(1)
+        rng = np.random.default_rng(7)
+        origins = rng.uniform(-1, 1, (200, 3)) + (0, 0, -6)
+        directions = rng.uniform(-0.3, 0.3, (200, 3)) + (0, 0, 1)
+        t0, t1, mask = s.intersect_batch(origins, directions)
+        for i in range(len(origins)):
+            xs = s.intersect(Ray(Point(*origins[i]), Vector(*directions[i])))
+            self.assertEqual(bool(mask[i]), len(xs) == 2)
+            if xs:
+                self.assertLess(abs(t0[i] - xs[0].t), EPSILON)
+                self.assertLess(abs(t1[i] - xs[1].t), EPSILON)
+
+    def test_batch_normals_match_scalar_normals(self):
+        s = Sphere()
+        s.transform = translation(0, 1, 0) * scaling(1, 0.5, 1) * rotation_z(pi / 5)
+        rng = np.random.default_rng(4)
+        directions = rng.normal(size=(50, 3))
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+        local = np.hstack([directions, np.ones((50, 1))])
+        points = (local @ np.array(s.transform.grid).T)[:, :3]
+        normals = s.normal_at_batch(points)
+        for point, normal in zip(points, normals):
+            expected = s.normal_at(Point(*point))
+            self.assertTrue(
+                np.allclose(normal, (expected.x, expected.y, expected.z), atol=EPSILON)
+            )
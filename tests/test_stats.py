@@ -0,0 +1,84 @@
+from math import pi
+import json
+import unittest
+
+from raytracer import stats
+from raytracer.camera import Camera
+from raytracer.canvas import Canvas
+from raytracer.render import render
+from raytracer.transformation import scaling, view_transform
+from raytracer.tuple import Point, Vector
+from tests.test_world import default_world
+
+
+def camera(size: int) -> Camera:
+    c = Camera(size, size, pi / 3)
+    c.transform = view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+    return c
+
+
+class TestStats(unittest.TestCase):
+    def test_collection_is_disabled_by_default(self):
+        assert stats.current is None
+        render(default_world(), camera(4), Canvas(4, 4))
+        assert stats.current is None
+
+    def test_batch_and_scalar_count_the_same_lighting_calls(self):
+        w = default_world()
+        counters = []
+        for batch in (False, True):
+            with stats.collect() as collector:
+                render(w, camera(8), Canvas(8, 8), batch=batch)
+            counters.append(collector.counters)
+        scalar, batch = counters
+        self.assertEqual(scalar["lighting_calls"], batch["lighting_calls"])
+        self.assertEqual(scalar["lighting_calls"], scalar["hits"] * len(w.lights))
+
+    def test_render_counts_rays_hits_and_misses(self):
+        w = default_world()
+        for batch in (False, True):
+            with stats.collect() as collector:
+                render(w, camera(8), Canvas(8, 8), tile=3, batch=batch)
+            counters = collector.counters
+            self.assertEqual(counters["rays"], 64)
+            self.assertEqual(counters["hits"] + counters["misses"], 64)
+            assert 0 < counters["hits"] < 64
+            assert counters["intersection_tests"] >= counters["hits"]
+            assert counters["lighting_calls"] > 0
+            self.assertEqual(
+                set(collector.phases), {"ray_generation", "intersection", "shading"}
+            )
+            self.assertEqual(collector.phases["shading"]["calls"], 9)
+        assert stats.current is None
+
+    def test_scalar_and_batch_find_the_same_hits(self):
+        w = default_world()
+        with stats.collect() as scalar:
+            render(w, camera(8), Canvas(8, 8))
+        with stats.collect() as batch:
+            render(w, camera(8), Canvas(8, 8), batch=True)
+        self.assertEqual(scalar.counters["hits"], batch.counters["hits"])
+
+    def test_parallel_render_merges_worker_statistics(self):
+        w = default_world()
+        with stats.collect() as serial:
+            render(w, camera(8), Canvas(8, 8), tile=4)
+        with stats.collect() as parallel:
+            render(w, camera(8), Canvas(8, 8), workers=2, tile=4)
+        self.assertEqual(serial.counters, parallel.counters)
+        self.assertEqual(parallel.phases["intersection"]["calls"], 4)
+
+    def test_counts_matrix_inversions_and_encoding(self):
+        w = default_world()
+        with stats.collect() as collector:
+            w.objects[0].transform = scaling(2, 2, 2)
+            Canvas(4, 4).to_png()
+        self.assertEqual(collector.counters["matrix_inversions"], 1)
+        self.assertEqual(collector.phases["encoding"]["calls"], 1)
+
+    def test_statistics_serialize_to_json(self):
+        with stats.collect() as collector:
+            render(default_world(), camera(4), Canvas(4, 4))
+        report = json.loads(collector.to_json())
+        self.assertEqual(report["counters"]["rays"], 16)
+        assert report["phases"]["shading"]["seconds"] >= 0
@@ -9,7 +9,11 @@ from raytracer.transformation import (
     rotation_y,
     rotation_z,
     shearing,
+    view_transform,
+    Transform,
 )
+from raytracer.sphere import Sphere
+from raytracer.transformation_matrix import sin_cos
 from raytracer.tuple import point, vector
 
 
@@ -132,3 +136,76 @@ class TestTransformation(unittest.TestCase):
         p = point(1, 0, 1)
         T = Matrix.identity().rotate_x(pi / 2).scale(5, 5, 5).translate(10, 5, 7)
         self.assertEqual(T * p, point(15, 0, 7))
+
+    def test_transformation_matrix_for_default_orientation(self):
+        t = view_transform(point(0, 0, 0), point(0, 0, -1), vector(0, 1, 0))
+        self.assertEqual(t, Matrix.identity())
+
+    def test_view_transformation_looking_in_positive_z_direction(self):
+        t = view_transform(point(0, 0, 0), point(0, 0, 1), vector(0, 1, 0))
+        self.assertEqual(t, scaling(-1, 1, -1))
+
+    def test_view_transformation_moves_world(self):
+        t = view_transform(point(0, 0, 8), point(0, 0, 0), vector(0, 1, 0))
+        self.assertEqual(t, translation(0, 0, -8))
+
+    def test_arbitrary_view_transformation(self):
+        t = view_transform(point(1, 3, 2), point(4, -2, 8), vector(1, 1, 0))
+        self.assertEqual(
+            t,
+            Matrix(
+                [
+                    [-0.50709, 0.50709, 0.67612, -2.36643],
+                    [0.76772, 0.60609, 0.12122, -2.82843],
+                    [-0.35857, 0.59761, -0.71714, 0.00000],
+                    [0.00000, 0.00000, 0.00000, 1.00000],
+                ]
+            ),
+        )
+
+    def test_transform_builder_matches_fluent_matrix_chain(self):
+        t = (
+            Transform()
+            .rotate_x(pi / 3)
+            .shear(1, 0.5, 0, 2, 0.25, 0)
+            .scale(2, 3, 4)
+            .rotate_y(pi / 5)
+            .rotate_z(-pi / 7)
+            .translate(10, 5, 7)
+        )
+        expected = (
+            Matrix.identity()
+            .rotate_x(pi / 3)
+            .shear(1, 0.5, 0, 2, 0.25, 0)
+            .scale(2, 3, 4)
+            .rotate_y(pi / 5)
+            .rotate_z(-pi / 7)
+            .translate(10, 5, 7)
+        )
+        self.assertEqual(t.matrix(), expected)
+        self.assertEqual(t.inverse(), expected.inverse())
+
+    def test_transform_builder_caches_until_next_operation(self):
+        t = Transform().scale(2, 2, 2)
+        m = t.matrix()
+        assert t.matrix() is m
+        assert t.inverse() is t.inverse()
+        t.translate(1, 0, 0)
+        assert t.matrix() is not m
+        self.assertEqual(t.matrix(), translation(1, 0, 0) * scaling(2, 2, 2))
+
+    def test_empty_transform_is_identity(self):
+        self.assertEqual(Transform().matrix(), Matrix.identity())
+
+    def test_shape_accepts_transform_builder(self):
+        t = Transform().scale(2, 2, 2).translate(0, 1, 0)
+        s = Sphere()
+        s.transform = t
+        assert s.transform is t.matrix()
+        assert s.inverse is t.inverse()
+
+    def test_trig_values_are_memoized(self):
+        sin_cos(0.123)
+        hits = sin_cos.cache_info().hits
+        rotation_z(0.123)
+        self.assertEqual(sin_cos.cache_info().hits, hits + 1)
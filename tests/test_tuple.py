@@ -1,6 +1,14 @@
 import math
 import unittest
-from raytracer.tuple import Color, Tuple, Vector, nearly_equal, point, vector
+from raytracer.tuple import (
+    Color,
+    Point,
+    Tuple,
+    Vector,
+    nearly_equal,
+    point,
+    vector,
+)
 
 
 class TestTuple(unittest.TestCase):
@@ -115,6 +123,25 @@ class TestTuple(unittest.TestCase):
         r = v.reflect(n)
         assert r == Vector(1, 0, 0)
 
+    def test_tuples_have_no_instance_dict(self):
+        for t in (Tuple(1, 2, 3, 4), point(1, 2, 3), vector(1, 2, 3), Color(1, 2, 3)):
+            assert not hasattr(t, "__dict__")
+
+    def test_arithmetic_preserves_result_types(self):
+        p = point(3, 2, 1)
+        v = vector(5, 6, 7)
+        assert type(p + v) is Point
+        assert type(v * 2) is Vector
+        assert type(v.cross(v)) is Vector
+        assert type(p - p) is Tuple
+        assert type(-v) is Tuple
+        with self.assertRaises(TypeError):
+            p + p
+
+    def test_constructors_coerce_to_float(self):
+        for t in (Tuple(1, 2, 3, 4), point(1, 2, 3), vector(1, 2, 3), Color(1, 2, 3)):
+            assert all(type(c) is float for c in (t.x, t.y, t.z, t.w))
+
 
 class TestColor(unittest.TestCase):
     def test_colors_are_rgb_tuples(self):
@@ -141,3 +168,12 @@ class TestColor(unittest.TestCase):
         c1 = Color(1, 0.2, 0.4)
         c2 = Color(0.9, 1, 0.1)
         assert c1 * c2 == Color(0.9, 0.2, 0.04)
+
+    def test_color_channels_alias_coordinates(self):
+        c = Color(0.9, 0.6, 0.75)
+        assert (c.red, c.green, c.blue) == (c.x, c.y, c.z)
+        assert c.w == 0.0
+        assert type(c * c) is Color
+        assert type(c * 2) is Color
+        assert type(c + c) is Color
+        assert (c + c).red == 1.8
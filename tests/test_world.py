@@ -0,0 +1,244 @@
+import unittest
+
+import numpy as np
+
+from raytracer.intersection import IntersectionBuffer, hit
+from raytracer.light import Light
+from raytracer.ray import Ray
+from raytracer.sphere import Sphere
+from raytracer.transformation import scaling, translation
+from raytracer.tuple import Color, Point, Vector
+from raytracer.world import World
+
+
+def default_world() -> World:
+    s1 = Sphere()
+    s1.material.color = Color(0.8, 1.0, 0.6)
+    s1.material.diffuse = 0.7
+    s1.material.specular = 0.2
+    s2 = Sphere()
+    s2.transform = scaling(0.5, 0.5, 0.5)
+    w = World()
+    w.objects.extend([s1, s2])
+    w.light = Light(Point(-10, 10, -10), Color(1, 1, 1))
+    return w
+
+
+class TestWorld(unittest.TestCase):
+    def test_creating_world(self):
+        w = World()
+        self.assertEqual(w.objects, [])
+        self.assertEqual(w.lights, [])
+        self.assertIsNone(w.light)
+
+    def test_intersect_world_with_ray(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        xs = w.intersect(r)
+        self.assertEqual(len(xs), 4)
+        for x, t in zip(xs, [4, 4.5, 5.5, 6]):
+            self.assertAlmostEqual(x.t, t)
+
+    def test_intersect_includes_shapes_behind_the_origin(self):
+        w = default_world()
+        behind = Sphere()
+        behind.transform = translation(0, 0, -10)
+        w.objects.append(behind)
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        xs = w.intersect(r)
+        self.assertEqual([x.object for x in xs[:2]], [behind, behind])
+        self.assertAlmostEqual(xs[0].t, -6)
+        self.assertEqual(len(xs), 6)
+        self.assertIs(hit(xs).object, w.objects[0])
+        buffer = IntersectionBuffer()
+        self.assertEqual(len(w.intersect_into(r, buffer)), 6)
+
+    def test_intersect_does_not_modify_ray(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        w.intersect(r)
+        self.assertEqual(r.origin, Point(0, 0, -5))
+        self.assertEqual(r.direction, Vector(0, 0, 1))
+
+    def test_color_when_ray_misses(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 1, 0))
+        self.assertEqual(w.color_at(r), Color(0, 0, 0))
+
+    def test_color_when_ray_hits(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertEqual(w.color_at(r), Color(0.38066, 0.47583, 0.2855))
+
+    def test_color_with_intersection_behind_ray(self):
+        w = default_world()
+        outer, inner = w.objects
+        outer.material.ambient = 1
+        inner.material.ambient = 1
+        r = Ray(Point(0, 0, 0.75), Vector(0, 0, -1))
+        self.assertEqual(w.color_at(r), inner.material.color)
+
+    def test_color_sums_contributions_of_all_lights(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        single = w.color_at(r)
+        w.lights.append(Light(Point(-10, 10, -10), Color(1, 1, 1)))
+        self.assertEqual(w.color_at(r), single * 2)
+
+    def test_intersect_sees_objects_added_after_first_query(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertEqual(len(w.intersect(r)), 4)
+        s = Sphere()
+        s.transform = translation(0, 0, 10)
+        w.objects.append(s)
+        self.assertEqual(len(w.intersect(r)), 6)
+
+    def test_intersect_sees_reassigned_transforms(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertEqual(len(w.intersect(r)), 4)
+        w.objects[0].transform = translation(0, 5, 0)
+        self.assertEqual(len(w.intersect(r)), 2)
+
+    def test_intersect_sees_objects_replaced_in_place(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        away = Sphere()
+        away.transform = translation(0, 5, 0)
+        self.assertEqual(len(w.intersect(r)), 4)
+        w.objects[1] = away
+        self.assertEqual(len(w.intersect(r)), 2)
+        w.objects = [away]
+        self.assertEqual(len(w.intersect(r)), 0)
+
+    def test_unrelated_shapes_leave_the_bvh_alone(self):
+        w = default_world()
+        bvh = w.bvh
+        elsewhere = default_world()
+        elsewhere.objects[0].transform = translation(0, 5, 0)
+        Sphere()
+        self.assertIs(w.bvh, bvh)
+        w.objects[0].transform = translation(0, 5, 0)
+        self.assertIsNot(w.bvh, bvh)
+
+    def test_intersect_matches_brute_force_for_many_objects(self):
+        w = World()
+        for i in range(50):
+            s = Sphere()
+            s.transform = translation(i % 7 - 3, i // 7 - 3, i % 5) * scaling(
+                0.4, 0.4, 0.4
+            )
+            w.objects.append(s)
+        for x in range(-3, 4):
+            r = Ray(Point(x, 0.1 * x, -5), Vector(0, 0, 1))
+            expected = sorted(t.t for s in w.objects for t in s.intersect(r))
+            self.assertEqual([x.t for x in w.intersect(r)], expected)
+
+    def test_batch_colors_match_scalar_colors(self):
+        w = default_world()
+        w.objects[1].material.color = Color(0.2, 0.3, 1)
+        w.objects[1].transform = translation(0.5, 0, -1.2) * scaling(0.5, 0.5, 0.5)
+        rng = np.random.default_rng(6)
+        origins = np.tile([0.0, 0.0, -5.0], (200, 1))
+        directions = rng.uniform(-0.3, 0.3, (200, 3)) + (0, 0, 1)
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+        colors = w.color_at_batch(origins, directions)
+        for origin, direction, color in zip(origins, directions, colors):
+            expected = w.color_at(Ray(Point(*origin), Vector(*direction)))
+            self.assertEqual(Color(*color), expected)
+
+    def test_no_shadow_when_nothing_is_collinear_with_point_and_light(self):
+        self.assertFalse(default_world().is_shadowed(Point(0, 10, 0)))
+
+    def test_shadow_when_object_is_between_point_and_light(self):
+        self.assertTrue(default_world().is_shadowed(Point(10, -10, 10)))
+
+    def test_no_shadow_when_object_is_behind_light(self):
+        self.assertFalse(default_world().is_shadowed(Point(-20, 20, -20)))
+
+    def test_no_shadow_when_object_is_behind_point(self):
+        self.assertFalse(default_world().is_shadowed(Point(-2, 2, -2)))
+
+    def test_no_shadow_without_a_light(self):
+        w = default_world()
+        w.lights = []
+        self.assertFalse(w.is_shadowed(Point(10, -10, 10)))
+
+    def test_no_shadow_at_the_light(self):
+        w = default_world()
+        self.assertFalse(w.is_shadowed(w.light.position))
+        points = np.array([[-10.0, 10, -10], [10, -10, 10]])
+        self.assertEqual(w.is_shadowed_batch(points, w.light).tolist(), [False, True])
+
+    def test_shade_hit_is_given_intersection_in_shadow(self):
+        w = World()
+        w.light = Light(Point(0, 0, -10), Color(1, 1, 1))
+        s2 = Sphere()
+        s2.transform = translation(0, 0, 10)
+        w.objects.extend([Sphere(), s2])
+        r = Ray(Point(0, 0, 5), Vector(0, 0, 1))
+        self.assertEqual(w.color_at(r), Color(0.1, 0.1, 0.1))
+        colors = w.color_at_batch(np.array([[0, 0, 5.0]]), np.array([[0, 0, 1.0]]))
+        self.assertEqual(Color(*colors[0]), Color(0.1, 0.1, 0.1))
+
+    def test_batch_shadows_match_scalar_shadows(self):
+        w = default_world()
+        points = np.random.default_rng(3).uniform(-12, 12, (200, 3))
+        shadowed = w.is_shadowed_batch(points, w.light)
+        for point, expected in zip(points, shadowed):
+            self.assertEqual(w.is_shadowed(Point(*point)), expected)
+        assert 0 < shadowed.sum() < len(points)
+
+    def test_batch_color_when_rays_start_inside_object(self):
+        w = default_world()
+        outer, inner = w.objects
+        outer.material.ambient = 1
+        inner.material.ambient = 1
+        colors = w.color_at_batch(np.array([[0, 0, 0.75]]), np.array([[0, 0, -1]]))
+        self.assertEqual(Color(*colors[0]), inner.material.color)
+
+    def test_nearest_hit_matches_hit_of_all_intersections(self):
+        w = World()
+        rng = np.random.default_rng(8)
+        for position in rng.uniform(-3, 3, (60, 3)):
+            s = Sphere()
+            s.transform = translation(*position) * scaling(0.5, 0.5, 0.5)
+            w.objects.append(s)
+        for origin, target in zip(
+            rng.uniform(-4, 4, (100, 3)), rng.uniform(-2, 2, (100, 3))
+        ):
+            r = Ray(Point(*origin), Vector(*(target - origin)).normalize())
+            expected = hit(w.intersect(r))
+            nearest = w.nearest_hit(r)
+            if expected is None:
+                self.assertIsNone(nearest)
+            else:
+                assert nearest is not None
+                self.assertIs(nearest.object, expected.object)
+                self.assertEqual(nearest.t, expected.t)
+
+    def test_nearest_hit_respects_t_range(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertAlmostEqual(w.nearest_hit(r).t, 4)
+        self.assertAlmostEqual(w.nearest_hit(r, t_min=4.2).t, 4.5)
+        self.assertIsNone(w.nearest_hit(r, t_max=3.9))
+        self.assertIsNone(w.nearest_hit(r, t_min=6.1))
+        self.assertIsNone(World().nearest_hit(r))
+
+    def test_intersect_into_buffer(self):
+        w = default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        buffer = IntersectionBuffer()
+        w.intersect_into(r, buffer)
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(
+            sorted(zip(buffer.t[:4], buffer.object_ids[:4])),
+            sorted((x.t, w.objects.index(x.object)) for x in w.intersect(r)),
+        )
+        i = buffer.nearest()
+        self.assertAlmostEqual(buffer.t[i], 4)
+        self.assertEqual(buffer.object_ids[i], 0)
+        w.intersect_into(Ray(Point(0, 0, -5), Vector(0, 1, 0)), buffer)
+        self.assertEqual(len(buffer), 0)